@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 from datetime import timedelta
+import importlib.util
 import os
 from dotenv import load_dotenv
 
@@ -52,7 +53,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'finance.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -60,20 +61,66 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+    'DEFAULT_RENDERER_CLASSES': [
+        'finance.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'finance.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10
 }
 
+# MessagePack (Accept / Content-Type: application/msgpack) when the optional package is installed
+if importlib.util.find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('finance.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('finance.parsers.MessagePackParser')
+
+# Largest ?page_size= a client may ask for with ?pagination=cursor on /api/transactions/
+TRANSACTION_MAX_PAGE_SIZE = int(os.getenv('TRANSACTION_MAX_PAGE_SIZE', '100'))
+
+# Maximum number of items accepted by POST /api/transactions/bulk/
+TRANSACTION_BULK_CREATE_LIMIT = int(os.getenv('TRANSACTION_BULK_CREATE_LIMIT', '1000'))
+
+# Rows fetched per database round trip by GET /api/transactions/export/
+TRANSACTION_EXPORT_CHUNK_SIZE = int(os.getenv('TRANSACTION_EXPORT_CHUNK_SIZE', '2000'))
+
+# Per-process cache of authenticated users (finance.authentication); a TTL of 0 disables it
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', '60'))
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', '10000'))
+
+# Seconds to coalesce last_login updates before one bulk write; 0 writes on every login
+LAST_LOGIN_FLUSH_INTERVAL = int(os.getenv('LAST_LOGIN_FLUSH_INTERVAL', '10'))
+
+# Response compression (finance.middleware.CompressionMiddleware); brotli is used when installed
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '5'))
+# Largest gzip-encoded request body accepted, measured after decompression
+COMPRESSION_MAX_REQUEST_SIZE = int(os.getenv('COMPRESSION_MAX_REQUEST_SIZE', str(10 * 1024 * 1024)))
+
+# Per-request instrumentation (finance.middleware.PerformanceMiddleware)
+SERVER_TIMING = os.getenv('SERVER_TIMING', str(DEBUG)) == 'True'
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '500'))
+SLOW_REQUEST_QUERIES = int(os.getenv('SLOW_REQUEST_QUERIES', '50'))
+SLOW_REQUEST_TOP_SQL = int(os.getenv('SLOW_REQUEST_TOP_SQL', '5'))
+
 MIDDLEWARE = [
+    'finance.middleware.PerformanceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'finance.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'finance.middleware.ReadReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'budget_tracker.urls'
@@ -103,10 +150,83 @@ WSGI_APPLICATION = 'budget_tracker.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+        # Reuse connections across requests (and PRAGMA setup with them); 0 closes after each request
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
     }
 }
 
+# Read replica for analytics reads (see finance.routers and finance.middleware).
+# Enabled by READ_REPLICA_NAME; keep it in sync with `manage.py sync_replica`, and
+# keep STICKY_SECONDS above the sync interval so clients read their own writes.
+READ_REPLICA = {
+    'ALIAS': 'replica',
+    'NAME': os.getenv('READ_REPLICA_NAME', ''),
+    'STICKY_SECONDS': int(os.getenv('READ_REPLICA_STICKY_SECONDS', '10')),
+    'COOKIE_NAME': 'last_write',
+    'HEADER': 'X-Last-Write',
+    'VIEWS': (
+        'DashboardView',
+        'TransactionViewSet.list',
+        'TransactionViewSet.retrieve',
+        'TransactionViewSet.monthly_trends',
+        'BudgetViewSet.list',
+        'BudgetViewSet.retrieve',
+        'BudgetViewSet.summary',
+        'CategoryViewSet.list',
+        'CategoryViewSet.retrieve',
+    ),
+}
+
+if READ_REPLICA['NAME']:
+    DATABASES[READ_REPLICA['ALIAS']] = {
+        **DATABASES['default'],
+        'NAME': READ_REPLICA['NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['finance.routers.ReadReplicaRouter']
+
+# Applied to every new SQLite connection by finance.db.configure_sqlite_connection.
+# WAL lets readers run alongside the single writer, busy_timeout makes writers wait
+# for the lock instead of failing with "database is locked", and synchronous=NORMAL
+# is durable under WAL except for the last commits on power loss.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000')),  # milliseconds
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024))),  # bytes
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-20000')),  # negative means KiB
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+
+
+# Cache
+# The default is per-process memory. Several workers must share the dashboard cache
+# and per-user data versions, so set CACHE_LOCATION to a directory owned by this
+# deployment (gunicorn.conf.py does) or CACHE_BACKEND/CACHE_LOCATION to e.g. Redis.
+
+CACHE_LOCATION = os.getenv('CACHE_LOCATION', '')
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+            'LOCATION': CACHE_LOCATION,
+            'OPTIONS': {
+                'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '10000')),
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', '300'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -158,7 +278,8 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    # Logins record last_login through finance.logins.last_logins instead
+    'UPDATE_LAST_LOGIN': False,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'VERIFYING_KEY': None,
@@ -170,6 +291,9 @@ SIMPLE_JWT = {
     'JTI_CLAIM': 'jti',
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
     'USER_AUTHENTICATION_RULE': 'rest_framework_simplejwt.authentication.default_user_authentication_rule',
+    # Check the blacklist through finance.blacklist's Bloom filter before the database
+    'TOKEN_REFRESH_SERIALIZER': 'finance.blacklist.FilteredTokenRefreshSerializer',
+    'TOKEN_VERIFY_SERIALIZER': 'finance.blacklist.FilteredTokenVerifySerializer',
 }
 
 # CORS settings
@@ -203,4 +327,28 @@ CORS_ALLOWED_HEADERS = [
 # Authentication settings
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
-]
\ No newline at end of file
+]
+
+# In-process Bloom filter of blacklisted refresh tokens (finance.blacklist). Tokens
+# blacklisted by other processes are picked up within TOKEN_BLACKLIST_SYNC_SECONDS.
+TOKEN_BLACKLIST_FILTER_CAPACITY = int(os.getenv('TOKEN_BLACKLIST_FILTER_CAPACITY', '100000'))
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = float(os.getenv('TOKEN_BLACKLIST_FILTER_ERROR_RATE', '0.001'))
+TOKEN_BLACKLIST_SYNC_SECONDS = float(os.getenv('TOKEN_BLACKLIST_SYNC_SECONDS', '5'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        # One JSON line per slow request
+        'finance.performance': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
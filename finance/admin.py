@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Category, Transaction, Budget
+from .models import Category, Transaction, Budget, MonthlyCategoryTotal
 
 admin.site.register(Category)
 admin.site.register(Transaction)
 admin.site.register(Budget)
+admin.site.register(MonthlyCategoryTotal)
@@ -0,0 +1,91 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import get_auth_stamp
+
+
+class UserCache:
+    """A small thread-safe LRU of user objects whose entries expire after ``ttl`` seconds.
+
+    Each entry remembers the stamp it was cached under, and ``get`` only returns
+    it while the caller passes the same stamp. The cache lives in process memory,
+    so the stamp (shared through ``django.core.cache``) is what carries a save in
+    another process over to this one.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id, stamp):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            expires, cached_stamp, user = entry
+            if expires < time.monotonic() or cached_stamp != stamp:
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+        # Each request gets its own copy so per-request changes never leak between them
+        return copy.copy(user)
+
+    def set(self, user_id, user, stamp):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        with self.lock:
+            self.entries[user_id] = (time.monotonic() + self.ttl, stamp, copy.copy(user))
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that serves the token's user from ``user_cache``.
+
+    Only active users are cached. ``finance.signals`` bumps the user's auth stamp
+    whenever the user is saved or deleted, e.g. on deactivation or password change,
+    which invalidates the entry in every worker on its next hit. The stamp is read
+    before the user, so a save racing a miss leaves a stale entry that is never served.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        stamp = get_auth_stamp(user_id)
+        user = user_cache.get(user_id, stamp)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user, stamp)
+            return user
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
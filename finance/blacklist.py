@@ -0,0 +1,140 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer, TokenVerifySerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings: no false negatives, ~``error_rate`` false positives."""
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, key):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(key))
+
+
+class BlacklistFilter:
+    """In-process Bloom filter of blacklisted refresh token JTIs.
+
+    Built from the unexpired blacklist on first use, updated directly when this
+    process blacklists a token, and topped up with rows other processes added
+    at most every ``TOKEN_BLACKLIST_SYNC_SECONDS``. A miss means the token is not
+    blacklisted (up to that sync window); a hit still has to be confirmed in the
+    database.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.last_id = 0
+        self.synced_at = 0.0
+
+    def might_contain(self, jti):
+        with self.lock:
+            if self.bloom is None:
+                self.rebuild()
+            elif time.monotonic() - self.synced_at >= settings.TOKEN_BLACKLIST_SYNC_SECONDS:
+                self.sync()
+            return jti in self.bloom
+
+    def add(self, jti):
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+
+    def reset(self):
+        with self.lock:
+            self.bloom = None
+
+    def rebuild(self):
+        # The high-water mark covers the whole table, expired rows included: syncs
+        # must start after them even though they are never loaded
+        last_id = BlacklistedToken.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+        rows = list(
+            BlacklistedToken.objects.filter(pk__lte=last_id, token__expires_at__gt=aware_utcnow())
+            .order_by('pk')
+            .values_list('pk', 'token__jti')
+        )
+        self.bloom = BloomFilter(
+            max(settings.TOKEN_BLACKLIST_FILTER_CAPACITY, 2 * len(rows)),
+            settings.TOKEN_BLACKLIST_FILTER_ERROR_RATE
+        )
+        self.last_id = last_id
+        self.load(rows)
+
+    def sync(self):
+        rows = list(
+            BlacklistedToken.objects.filter(pk__gt=self.last_id)
+            .order_by('pk')
+            .values_list('pk', 'token__jti')
+        )
+        if self.bloom.count + len(rows) > self.bloom.capacity:
+            # Past capacity the false positive rate climbs; resize from the table
+            self.rebuild()
+        else:
+            self.load(rows)
+
+    def load(self, rows):
+        for pk, jti in rows:
+            self.bloom.add(jti)
+            self.last_id = max(self.last_id, pk)
+        self.synced_at = time.monotonic()
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class FilteredRefreshToken(RefreshToken):
+    """A ``RefreshToken`` whose blacklist check only queries the database on a filter hit."""
+
+    def check_blacklist(self):
+        if blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+
+class FilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = FilteredRefreshToken
+
+
+class FilteredTokenVerifySerializer(TokenVerifySerializer):
+    def validate(self, attrs):
+        token = UntypedToken(attrs['token'])
+
+        jti = token.get(api_settings.JTI_CLAIM)
+        if (
+            api_settings.BLACKLIST_AFTER_ROTATION
+            and blacklist_filter.might_contain(jti)
+            and BlacklistedToken.objects.filter(token__jti=jti).exists()
+        ):
+            raise ValidationError(_('Token is blacklisted'))
+
+        return {}
+
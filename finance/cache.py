@@ -0,0 +1,84 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+DATA_VERSION_KEY = 'finance:data-version:{user_id}'
+DASHBOARD_KEY = 'finance:dashboard:{user_id}:{version}:{start_date}:{end_date}'
+AUTH_STAMP_KEY = 'finance:auth-stamp:{user_id}'
+
+
+def get_data_version(user_id):
+    """Return the current data version stamp for a user.
+
+    The stamp is a nanosecond timestamp rather than a counter so that bumping it
+    is a plain ``set`` and stays correct on cache backends without atomic incr.
+    """
+    version = cache.get(DATA_VERSION_KEY.format(user_id=user_id))
+    if version is None:
+        version = bump_data_version(user_id)
+    return version
+
+
+def bump_data_version(user_id):
+    """Invalidate every cached result derived from a user's finance data."""
+    version = time.time_ns()
+    cache.set(DATA_VERSION_KEY.format(user_id=user_id), version, None)
+    return version
+
+
+def bump_data_version_on_commit(user_id, using=None):
+    """``bump_data_version`` once the current transaction commits (at once outside one).
+
+    Bumping before the commit would let a concurrent reader cache the old rows
+    under the new version.
+    """
+    transaction.on_commit(lambda: bump_data_version(user_id), using=using)
+
+
+def bump_data_versions(user_ids):
+    """``bump_data_version`` for many users with one cache round trip."""
+    version = time.time_ns()
+    cache.set_many({DATA_VERSION_KEY.format(user_id=user_id): version for user_id in user_ids}, None)
+    return version
+
+
+def get_auth_stamp(user_id):
+    """Return the stamp that every process's auth cache entry for a user is checked against.
+
+    A missing stamp is only added, never overwritten, so a bump that lands
+    meanwhile from another process still wins.
+    """
+    key = AUTH_STAMP_KEY.format(user_id=user_id)
+    stamp = cache.get(key)
+    if stamp is None:
+        cache.add(key, time.time_ns(), None)
+        stamp = cache.get(key)
+    return stamp
+
+
+def bump_auth_stamp(user_id):
+    """Invalidate a user's entry in the auth cache of every process sharing this cache."""
+    cache.set(AUTH_STAMP_KEY.format(user_id=user_id), time.time_ns(), None)
+
+
+def bump_auth_stamp_on_commit(user_id, using=None):
+    transaction.on_commit(lambda: bump_auth_stamp(user_id), using=using)
+
+
+def dashboard_cache_key(user_id, start_date, end_date):
+    return DASHBOARD_KEY.format(
+        user_id=user_id,
+        version=get_data_version(user_id),
+        start_date=start_date,
+        end_date=end_date
+    )
+
+
+def get_cached_dashboard(key):
+    return cache.get(key)
+
+
+def set_cached_dashboard(key, data):
+    cache.set(key, data, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
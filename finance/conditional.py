@@ -0,0 +1,87 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from .cache import get_data_version
+from .routers import reading_from_replica
+
+CONDITIONAL_METHODS = ('GET', 'HEAD')
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+    default_detail = 'Not modified.'
+    default_code = 'not_modified'
+
+
+def etag_matches(header, etag):
+    """Weak comparison of ``etag`` against an ``If-None-Match`` header value."""
+    if header.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(candidate.strip().removeprefix('W/') == opaque for candidate in header.split(','))
+
+
+class ConditionalGetMixin:
+    """Answer unchanged GET/HEAD refetches with ``304 Not Modified``.
+
+    Validators come from the user's data version (bumped on every write to
+    their transactions, categories and budgets) plus today's date, because
+    responses such as the dashboard default to ranges relative to today. The
+    check runs in ``initial``, after authentication and content negotiation but
+    before the handler touches a queryset.
+
+    ``Last-Modified`` is the version's timestamp rounded up to a whole second,
+    and it is only sent once that second has passed. Until then a second write
+    in the same second would get the same value, so a client could be told
+    ``304`` for data it has never seen.
+
+    Responses read from the replica get no validators: the replica may lag
+    behind the data version, and a stale body must not be revalidated as
+    current once it has caught up.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.conditional_headers = None
+        if request.method not in CONDITIONAL_METHODS or reading_from_replica():
+            return
+
+        version = get_data_version(request.user.pk)
+        today = timezone.now().date()
+        etag = f'W/"{request.user.pk}-{version}-{today:%Y%m%d}-{request.accepted_renderer.format}"'
+        start_of_today = datetime(today.year, today.month, today.day, tzinfo=dt_timezone.utc).timestamp()
+        last_modified = max(-(-version // 1_000_000_000), int(start_of_today))
+        settled = last_modified <= time.time()
+        self.conditional_headers = {'ETag': etag}
+        if settled:
+            self.conditional_headers['Last-Modified'] = http_date(last_modified)
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            if etag_matches(if_none_match, etag):
+                raise NotModified()
+            return
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        if settled and if_modified_since is not None and last_modified <= if_modified_since:
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        headers = getattr(self, 'conditional_headers', None)
+        if headers and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            for name, value in headers.items():
+                response[name] = value
+            # Let browsers keep the body but always revalidate it with us
+            response['Cache-Control'] = 'private, no-cache'
+        return response
@@ -0,0 +1,29 @@
+from django.conf import settings
+
+# PRAGMAs the connection hook may set, so a typo in settings fails loudly
+SUPPORTED_PRAGMAS = ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size', 'cache_size', 'temp_store')
+
+
+def apply_pragmas(cursor, pragmas):
+    """Run ``PRAGMA name = value`` for each configured setting on a DB-API cursor.
+
+    ``busy_timeout`` goes first so the others (journal_mode needs a lock) wait
+    for a busy database instead of failing.
+    """
+    for name, value in sorted(pragmas.items(), key=lambda item: item[0] != 'busy_timeout'):
+        if name not in SUPPORTED_PRAGMAS:
+            raise ValueError(f'Unsupported SQLite PRAGMA in SQLITE_PRAGMAS: {name}')
+        if value is None or value == '':
+            continue
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """``connection_created`` hook applying ``settings.SQLITE_PRAGMAS`` to new SQLite connections."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, pragmas)
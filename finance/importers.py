@@ -0,0 +1,198 @@
+import csv
+import hashlib
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from . import rollups
+from .cache import bump_data_version_on_commit
+from .models import Category, Transaction
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+REQUIRED_COLUMNS = ('date', 'description', 'amount')
+TRANSACTION_TYPES = dict(Transaction.TRANSACTION_TYPES)
+DESCRIPTION_MAX_LENGTH = Transaction._meta.get_field('description').max_length
+AMOUNT_FIELD = Transaction._meta.get_field('amount')
+CENT = Decimal(1).scaleb(-AMOUNT_FIELD.decimal_places)
+MAX_AMOUNT = Decimal(10) ** (AMOUNT_FIELD.max_digits - AMOUNT_FIELD.decimal_places) - CENT
+
+
+class StatementError(ValueError):
+    """The file cannot be imported at all (as opposed to individual bad rows)."""
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.duplicates = 0
+        self.categories_created = 0
+        self.errors = []
+        self.elapsed = 0.0
+        # Set when the rest of the file can't be read; rows before it are imported
+        self.error = None
+        self.stopped_after_line = None
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, line, message):
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'duplicates': self.duplicates,
+            'categories_created': self.categories_created,
+            'errors': self.errors,
+            'stopped_after_line': self.stopped_after_line,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1)
+        }
+
+
+def fingerprint(date, amount, description):
+    """Stable 16-byte hash of the fields that identify a duplicate statement line."""
+    key = f'{date.isoformat()}|{amount}|{description}'.encode()
+    return hashlib.blake2b(key, digest_size=16).digest()
+
+
+def parse_row(row):
+    """Turn a CSV dict row into ``(date, amount, type, description, category_name)``."""
+    date = parse_date((row.get('date') or '').strip())
+    if date is None:
+        raise ValueError('date must be in YYYY-MM-DD format')
+
+    try:
+        amount = Decimal((row.get('amount') or '').strip().replace(',', ''))
+    except InvalidOperation:
+        raise ValueError('amount must be a number')
+    # Decimal accepts NaN and Infinity, which would fail later as InvalidOperation
+    if not amount.is_finite():
+        raise ValueError('amount must be a number')
+
+    # Statements usually sign amounts; an explicit type column wins
+    type = (row.get('type') or '').strip().lower() or ('expense' if amount < 0 else 'income')
+    if type not in TRANSACTION_TYPES:
+        raise ValueError(f"type must be one of: {', '.join(TRANSACTION_TYPES)}")
+    # Checked before rounding: abs() and quantize() themselves fail on huge exponents
+    amount = amount.copy_abs()
+    if amount > MAX_AMOUNT:
+        raise ValueError(f'amount must be at most {MAX_AMOUNT}')
+    amount = amount.quantize(CENT)
+    if amount < CENT:
+        raise ValueError(f'amount must be at least {CENT}')
+
+    description = (row.get('description') or '').strip()[:DESCRIPTION_MAX_LENGTH]
+    if not description:
+        raise ValueError('description is required')
+
+    category_name = (row.get('category') or '').strip()
+    return date, amount, type, description, category_name
+
+
+def read_rows(reader, result):
+    """Yield CSV rows until the end of the file or the first line that can't be read."""
+    try:
+        yield from reader
+    except (UnicodeDecodeError, csv.Error) as e:
+        result.error = str(e)
+        result.stopped_after_line = reader.line_num
+
+
+def import_transactions(user, lines, chunk_size=IMPORT_CHUNK_SIZE):
+    """Import a bank statement CSV for ``user`` from an iterable of text lines.
+
+    The file is parsed as a stream and written in ``bulk_create`` chunks, each in
+    its own transaction. Category names resolve through one prefetched map, and
+    missing categories are created in bulk. Rows matching an existing or earlier
+    (date, amount, description) are skipped as duplicates.
+
+    A line that can't be decoded or parsed as CSV ends the import: the rows
+    before it are still imported, and ``result.error`` says where it stopped.
+    """
+    started = time.perf_counter()
+    result = ImportResult()
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None:
+        raise StatementError('The file is empty')
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    missing = [column for column in REQUIRED_COLUMNS if column not in reader.fieldnames]
+    if missing:
+        raise StatementError(f"Missing required columns: {', '.join(missing)}")
+
+    categories = {
+        category.name.casefold(): category
+        for category in Category.objects.filter(user=user)
+    }
+    seen = set()
+
+    chunk = []
+    for row in read_rows(reader, result):
+        result.rows += 1
+        try:
+            chunk.append((reader.line_num, parse_row(row)))
+        except ValueError as e:
+            result.add_error(reader.line_num, str(e))
+        if len(chunk) >= chunk_size:
+            import_chunk(user, chunk, categories, seen, result)
+            chunk = []
+    if chunk:
+        import_chunk(user, chunk, categories, seen, result)
+
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def import_chunk(user, chunk, categories, seen, result):
+    # One query finds rows already stored on any of this chunk's dates
+    existing = Transaction.objects.filter(
+        user=user,
+        date__in={parsed[0] for _, parsed in chunk}
+    ).values_list('date', 'amount', 'description')
+    known = {fingerprint(*values) for values in existing}
+
+    rows = []
+    for line, (date, amount, type, description, category_name) in chunk:
+        key = fingerprint(date, amount, description)
+        if key in known or key in seen:
+            result.duplicates += 1
+            continue
+        seen.add(key)
+        rows.append((date, amount, type, description, category_name))
+
+    with transaction.atomic():
+        new_categories = {}
+        for _, _, type, _, category_name in rows:
+            folded = category_name.casefold()
+            if category_name and folded not in categories and folded not in new_categories:
+                new_categories[folded] = Category(user=user, name=category_name, type=type)
+        if new_categories:
+            created = Category.objects.bulk_create(new_categories.values())
+            categories.update((category.name.casefold(), category) for category in created)
+            result.categories_created += len(created)
+
+        transactions = Transaction.objects.bulk_create([
+            Transaction(
+                user=user,
+                category=categories.get(category_name.casefold()) if category_name else None,
+                amount=amount,
+                type=type,
+                description=description,
+                date=date
+            )
+            for date, amount, type, description, category_name in rows
+        ])
+        # bulk_create skips model signals, so keep the rollup in step here
+        rollups.add_transactions(transactions)
+    result.created += len(transactions)
+    # Each chunk commits on its own, so invalidate caches per chunk: a later chunk
+    # may fail and leave these rows as the import's only result
+    if transactions or new_categories:
+        bump_data_version_on_commit(user.pk)
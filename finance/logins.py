@@ -0,0 +1,66 @@
+import atexit
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+FLUSH_BATCH_SIZE = 500
+
+
+class LastLoginBuffer:
+    """Coalesce ``last_login`` updates and write them in one bulk UPDATE.
+
+    Logins only record the time in memory; repeated logins by the same user
+    collapse to the latest. Pending times are written ``LAST_LOGIN_FLUSH_INTERVAL``
+    seconds after the first unflushed login (from a timer thread), and at process
+    exit. An interval of 0 writes on every login, like Django's ``update_last_login``.
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.timer = None
+
+    def record(self, user):
+        user.last_login = timezone.now()
+        interval = settings.LAST_LOGIN_FLUSH_INTERVAL
+        if interval <= 0:
+            user.save(update_fields=['last_login'])
+            return
+        with self.lock:
+            self.pending[user.pk] = user.last_login
+            if self.timer is None:
+                self.timer = threading.Timer(interval, self.flush_in_background)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """Write every pending ``last_login``; returns the number of users updated."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not pending:
+            return 0
+        User = get_user_model()
+        # bulk_update skips post_save, which is fine: nothing downstream depends on last_login
+        User.objects.bulk_update(
+            [User(pk=user_id, last_login=last_login) for user_id, last_login in pending.items()],
+            ['last_login'],
+            batch_size=FLUSH_BATCH_SIZE
+        )
+        return len(pending)
+
+    def flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            # Timer threads are short-lived; don't leave their connection open
+            connection.close()
+
+
+last_logins = LastLoginBuffer()
+atexit.register(last_logins.flush)
@@ -0,0 +1,198 @@
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+from finance.logins import last_logins
+from finance.management.commands.seed_load import SEED_PASSWORD
+from finance.models import Budget, Category, Transaction
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from contextlib import ExitStack
+import django
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class Command(BaseCommand):
+    help = 'Benchmark every finance API endpoint through the test client and report latency, queries and memory as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', type=str, help='User to benchmark as (default: the first seed_load user)')
+        parser.add_argument('--password', type=str, default=SEED_PASSWORD, help='Password for the login endpoint')
+        parser.add_argument('--iterations', type=int, default=30, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per endpoint first')
+        parser.add_argument('--only', type=str, help='Comma-separated endpoint names to run')
+        parser.add_argument('--output', type=str, help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+        user = self.get_user(options['username'])
+
+        self.client = APIClient(SERVER_NAME='localhost')
+        self.user = user
+        self.password = options['password']
+        self.transaction = Transaction.objects.filter(user=user).order_by('-date').first()
+        self.category = Category.objects.filter(user=user, type='expense').first()
+        self.budget = Budget.objects.filter(user=user).order_by('-start_date').first()
+        if self.transaction is None or self.category is None or self.budget is None:
+            raise CommandError(f'{user.username} needs transactions, categories and budgets; run seed_load first')
+
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        scenarios = self.scenarios()
+        if options['only']:
+            wanted = set(options['only'].split(','))
+            unknown = wanted - {name for name, _, _, _ in scenarios}
+            if unknown:
+                raise CommandError(f'Unknown endpoints: {", ".join(sorted(unknown))}')
+            scenarios = [scenario for scenario in scenarios if scenario[0] in wanted]
+
+        endpoints = {}
+        for name, method, path, data in scenarios:
+            endpoints[name] = self.run_scenario(method, path, data, options['warmup'], options['iterations'])
+            self.stderr.write(
+                f'{name:>22}: p50 {endpoints[name]["p50_ms"]:8.2f} ms  p99 {endpoints[name]["p99_ms"]:8.2f} ms  '
+                f'{endpoints[name]["queries"]:3d} queries'
+            )
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'user': user.username,
+            'transactions': Transaction.objects.filter(user=user).count(),
+            'iterations': options['iterations'],
+            'endpoints': endpoints,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
+        else:
+            self.stdout.write(output)
+
+    def get_user(self, username):
+        users = User.objects.all()
+        if username:
+            users = users.filter(username=username)
+        else:
+            users = users.filter(username__startswith='load-user-').order_by('pk')
+        user = users.first()
+        if user is None:
+            raise CommandError('No benchmark user found; run seed_load or pass --username')
+        return user
+
+    def scenarios(self):
+        """``(name, method, path, data)`` for every route in finance/urls.py; data may be a callable."""
+        transaction_id, category_id, budget_id = self.transaction.pk, self.category.pk, self.budget.pk
+        new_transaction = {
+            'category': category_id, 'amount': '123.45', 'type': 'expense',
+            'description': 'Benchmark purchase', 'date': str(self.transaction.date)
+        }
+        statement = (
+            'date,description,amount,category\n'
+            + ''.join(f'2025-01-{day:02d},Benchmark import {day},-{day}.50,Groceries\n' for day in range(1, 29))
+        )
+        return [
+            ('auth.login', 'post', '/api/auth/login/', {'username': self.user.username, 'password': self.password}),
+            ('auth.logout', 'post', '/api/auth/logout/', lambda: {'refresh_token': str(RefreshToken.for_user(self.user))}),
+            ('auth.user', 'get', '/api/auth/user/', None),
+            ('dashboard', 'get', '/api/dashboard/', None),
+            ('transactions.list', 'get', '/api/transactions/', None),
+            ('transactions.cursor', 'get', '/api/transactions/?pagination=cursor&page_size=100', None),
+            ('transactions.fields', 'get', '/api/transactions/?pagination=cursor&page_size=100&fields=id,amount,date,category_name', None),
+            ('transactions.search', 'get', '/api/transactions/?search=supermarket', None),
+            ('transactions.retrieve', 'get', f'/api/transactions/{transaction_id}/', None),
+            ('transactions.create', 'post', '/api/transactions/', new_transaction),
+            ('transactions.update', 'put', f'/api/transactions/{transaction_id}/', new_transaction),
+            ('transactions.delete', 'delete', f'/api/transactions/{transaction_id}/', None),
+            ('transactions.bulk', 'post', '/api/transactions/bulk/', [new_transaction] * 100),
+            ('transactions.import', 'post', '/api/transactions/import/', lambda: {
+                'file': SimpleUploadedFile('statement.csv', statement.encode(), content_type='text/csv')
+            }),
+            ('transactions.export', 'get', '/api/transactions/export/?format=csv', None),
+            ('transactions.trends', 'get', '/api/transactions/monthly_trends/?months=12', None),
+            ('categories.list', 'get', '/api/categories/', None),
+            ('categories.retrieve', 'get', f'/api/categories/{category_id}/', None),
+            ('categories.create', 'post', '/api/categories/', {'name': 'Benchmark', 'type': 'expense'}),
+            ('categories.update', 'put', f'/api/categories/{category_id}/', {'name': 'Renamed', 'type': 'expense'}),
+            ('categories.delete', 'delete', f'/api/categories/{category_id}/', None),
+            ('categories.initialize_defaults', 'post', '/api/categories/initialize_defaults/', None),
+            ('budgets.list', 'get', '/api/budgets/', None),
+            ('budgets.retrieve', 'get', f'/api/budgets/{budget_id}/', None),
+            ('budgets.create', 'post', '/api/budgets/', {
+                'category': category_id, 'amount': '999.00', 'start_date': '2030-01-01', 'end_date': '2030-01-31'
+            }),
+            ('budgets.update', 'put', f'/api/budgets/{budget_id}/', {
+                'category': category_id, 'amount': '999.00',
+                'start_date': str(self.budget.start_date), 'end_date': str(self.budget.end_date)
+            }),
+            ('budgets.delete', 'delete', f'/api/budgets/{budget_id}/', None),
+            ('budgets.summary', 'get', '/api/budgets/summary/', None),
+        ]
+
+    def request(self, method, path, data):
+        if callable(data):
+            data = data()
+        format = 'multipart' if isinstance(data, dict) and 'file' in data else 'json'
+        response = getattr(self.client, method)(path, data, format=format)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def run_scenario(self, method, path, data, warmup, iterations):
+        latencies = []
+        queries = []
+        status_codes = set()
+        # Every request runs in a rolled-back savepoint so writes leave the data unchanged
+        for i in range(warmup + iterations + 1):
+            measure_memory = i == warmup + iterations
+            counter = QueryCounter()
+            with transaction.atomic():
+                with ExitStack() as stack:
+                    for alias in connections:
+                        stack.enter_context(connections[alias].execute_wrapper(counter))
+                    if measure_memory:
+                        tracemalloc.start()
+                    started = time.perf_counter()
+                    response = self.request(method, path, data)
+                    elapsed = time.perf_counter() - started
+                    if measure_memory:
+                        _, peak = tracemalloc.get_traced_memory()
+                        tracemalloc.stop()
+                last_logins.flush()
+                transaction.set_rollback(True)
+            status_codes.add(response.status_code)
+            if warmup <= i < warmup + iterations:
+                latencies.append(elapsed * 1000)
+                queries.append(counter.count)
+
+        return {
+            'method': method.upper(),
+            'path': path,
+            'status': sorted(status_codes),
+            'p50_ms': round(percentile(latencies, 0.50), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'queries': round(statistics.fmean(queries)),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
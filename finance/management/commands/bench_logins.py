@@ -0,0 +1,80 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from finance.logins import last_logins
+from rest_framework.test import APIClient
+import time
+
+PASSWORD = 'bench-login-password'
+
+class Command(BaseCommand):
+    help = 'Load test POST /api/auth/login/, reporting queries per login and latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Distinct users logging in')
+        parser.add_argument('--logins', type=int, default=200, help='Total logins, spread across the users')
+        parser.add_argument(
+            '--fast-hasher', action='store_true',
+            help='Hash passwords with MD5 so timings show the database work rather than PBKDF2'
+        )
+        parser.add_argument(
+            '--sync-last-login', action='store_true',
+            help='Write last_login on every login (LAST_LOGIN_FLUSH_INTERVAL=0) for comparison'
+        )
+
+    def handle(self, *args, **options):
+        overrides = {}
+        if options['fast_hasher']:
+            overrides['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+        if options['sync_last_login']:
+            overrides['LAST_LOGIN_FLUSH_INTERVAL'] = 0
+
+        with override_settings(**overrides):
+            # Everything, including the benchmark users, is rolled back afterwards
+            with transaction.atomic():
+                result = self.run_logins(options['users'], options['logins'])
+                transaction.set_rollback(True)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{options["logins"]} logins in {result["elapsed"]:.2f}s - '
+                f'{options["logins"] / result["elapsed"]:.0f} logins/sec, '
+                f'{result["queries"] / options["logins"]:.2f} queries/login, '
+                f'p50 {result["p50"] * 1000:.2f} ms, p99 {result["p99"] * 1000:.2f} ms, '
+                f'{result["flushed"]} last_login rows written in one flush'
+            )
+        )
+
+    def run_logins(self, user_count, logins):
+        usernames = [f'bench-login-{i}' for i in range(user_count)]
+        for username in usernames:
+            User.objects.create_user(username=username, password=PASSWORD)
+
+        client = APIClient(SERVER_NAME='localhost')
+        latencies = []
+        queries = 0
+        started = time.perf_counter()
+        for i in range(logins):
+            login_started = time.perf_counter()
+            with CaptureQueriesContext(connection) as captured:
+                response = client.post(
+                    '/api/auth/login/',
+                    {'username': usernames[i % user_count], 'password': PASSWORD},
+                    format='json'
+                )
+            latencies.append(time.perf_counter() - login_started)
+            queries += len(captured)
+            if response.status_code != 200:
+                raise RuntimeError(f'Login failed with {response.status_code}: {response.content!r}')
+        elapsed = time.perf_counter() - started
+        flushed = last_logins.flush()
+
+        latencies.sort()
+        return {
+            'elapsed': elapsed,
+            'queries': queries,
+            'flushed': flushed,
+            'p50': latencies[len(latencies) // 2],
+            'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        }
@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from finance.models import Category, Transaction
+from finance.parsers import MessagePackParser, ORJSONParser, msgpack, orjson
+from finance.renderers import MessagePackRenderer, ORJSONRenderer
+from finance.serializers import TransactionSerializer
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+import io
+import time
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark JSON, orjson and MessagePack rendering/parsing of a transaction page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Transactions in the page')
+        parser.add_argument('--repeat', type=int, default=50, help='Timed runs per format')
+
+    def handle(self, *args, **options):
+        page = self.build_page(options['rows'])
+        formats = [('json (DRF)', JSONRenderer(), JSONParser())]
+        if orjson is not None:
+            formats.append(('orjson', ORJSONRenderer(), ORJSONParser()))
+        if msgpack is not None:
+            formats.append(('msgpack', MessagePackRenderer(), MessagePackParser()))
+
+        self.stdout.write(f'{options["rows"]}-row transaction page, best of {options["repeat"]} runs')
+        baseline = None
+        for name, renderer, parser in formats:
+            body = renderer.render(page, renderer.media_type, {})
+            render_time = self.best_time(lambda: renderer.render(page, renderer.media_type, {}), options['repeat'])
+            parse_time = self.best_time(lambda: parser.parse(io.BytesIO(body), parser.media_type, {}), options['repeat'])
+            baseline = baseline or render_time
+            self.stdout.write(
+                f'{name:>12}: render {render_time * 1000:7.2f} ms ({baseline / render_time:4.1f}x)  '
+                f'parse {parse_time * 1000:7.2f} ms  {len(body):>8} bytes'
+            )
+
+    def build_page(self, rows):
+        """A paginated list response as TransactionViewSet returns it, built without the database."""
+        categories = [Category(id=i, name=f'Category {i}', type='expense') for i in range(1, 14)]
+        now = timezone.now()
+        transactions = [
+            Transaction(
+                id=i,
+                category=categories[i % len(categories)],
+                amount=Decimal('12.34') + i,
+                type='expense' if i % 3 else 'income',
+                description=f'Card payment {i} at Merchant {i % 97}',
+                date=date(2025, 1, 1) + timedelta(days=i % 365),
+                created_at=now,
+                updated_at=now
+            )
+            for i in range(1, rows + 1)
+        ]
+        return {
+            'count': rows,
+            'next': None,
+            'previous': None,
+            'results': TransactionSerializer(transactions, many=True).data
+        }
+
+    def best_time(self, func, repeat):
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+        return best
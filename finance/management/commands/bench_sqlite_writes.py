@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from finance.db import apply_pragmas
+from multiprocessing import Pool
+import os
+import sqlite3
+import tempfile
+import time
+
+# What a bare Django SQLite config runs with: SQLite's journal defaults plus the
+# 5 second busy timeout Python's sqlite3 module applies
+BASELINE_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 5000}
+
+def run_writer(args):
+    """Worker process: commit ``writes`` single-row transactions, counting lock failures."""
+    path, pragmas, writes, worker = args
+    connection = sqlite3.connect(path, timeout=0, isolation_level=None)
+    cursor = connection.cursor()
+    apply_pragmas(cursor, pragmas)
+
+    committed = locked = 0
+    latencies = []
+    for i in range(writes):
+        started = time.perf_counter()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(
+                'INSERT INTO bench (worker, amount, description) VALUES (?, ?, ?)',
+                (worker, i, f'write {i} from worker {worker}')
+            )
+            cursor.execute('COMMIT')
+            committed += 1
+        except sqlite3.OperationalError:
+            locked += 1
+            if connection.in_transaction:
+                cursor.execute('ROLLBACK')
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+    return committed, locked, latencies
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent SQLite write throughput with default vs configured SQLITE_PRAGMAS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() * 2 + 1, help='Concurrent writer processes')
+        parser.add_argument('--writes', type=int, default=200, help='Committed writes per worker')
+
+    def handle(self, *args, **options):
+        scenarios = [
+            ('baseline', BASELINE_PRAGMAS),
+            ('tuned', settings.SQLITE_PRAGMAS),
+        ]
+        self.stdout.write(f'{options["workers"]} workers x {options["writes"]} single-row transactions')
+        for name, pragmas in scenarios:
+            result = self.run_scenario(pragmas, options['workers'], options['writes'])
+            self.stdout.write(
+                f'{name:>8}: {result["throughput"]:8.0f} commits/sec  '
+                f'p50 {result["p50"] * 1000:6.2f} ms  p99 {result["p99"] * 1000:7.2f} ms  '
+                f'locked errors {result["locked"]}  ({pragmas})'
+            )
+
+    def run_scenario(self, pragmas, workers, writes):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.sqlite3')
+            connection = sqlite3.connect(path)
+            apply_pragmas(connection.cursor(), pragmas)
+            connection.execute(
+                'CREATE TABLE bench (id INTEGER PRIMARY KEY, worker INTEGER, amount INTEGER, description TEXT)'
+            )
+            connection.commit()
+            connection.close()
+
+            started = time.perf_counter()
+            with Pool(workers) as pool:
+                results = pool.map(run_writer, [(path, pragmas, writes, worker) for worker in range(workers)])
+            elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for _, _, worker_latencies in results for latency in worker_latencies)
+        committed = sum(result[0] for result in results)
+        return {
+            'throughput': committed / elapsed,
+            'locked': sum(result[1] for result in results),
+            'p50': latencies[len(latencies) // 2],
+            'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        }
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from finance.importers import IMPORT_CHUNK_SIZE, StatementError, import_transactions
+
+class Command(BaseCommand):
+    help = 'Import transactions for a user from a bank statement CSV (date, description, amount[, type][, category])'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', type=str, help='Username to import transactions for')
+        parser.add_argument('file', type=str, help='Path to the CSV file')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User with username {options["username"]} does not exist')
+
+        try:
+            with open(options['file'], newline='', encoding='utf-8-sig') as statement:
+                result = import_transactions(user, statement, chunk_size=options['chunk_size'])
+        except OSError as e:
+            raise CommandError(f'Could not read {options["file"]}: {e}')
+        except StatementError as e:
+            raise CommandError(str(e))
+
+        for error in result.errors:
+            self.stdout.write(self.style.WARNING(f'Line {error["line"]}: {error["error"]}'))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {result.created} of {result.rows} rows for {user.username} '
+                f'({result.duplicates} duplicates skipped, {result.categories_created} categories created) '
+                f'in {result.elapsed:.2f}s - {result.rows_per_second:.0f} rows/sec'
+            )
+        )
+        if result.error is not None:
+            raise CommandError(f'Import stopped: could not read {options["file"]} after line {result.stopped_after_line}: {result.error}')
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from finance import rollups
+import time
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly category totals rollup from the transaction table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', type=str, help='Only rebuild these users (default: everyone)')
+        parser.add_argument('--batch-size', type=int, default=rollups.REBUILD_BATCH_SIZE, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        users = None
+        if options['usernames']:
+            users = list(User.objects.filter(username__in=options['usernames']))
+            missing = set(options['usernames']) - {user.username for user in users}
+            if missing:
+                self.stdout.write(
+                    self.style.ERROR(f'Users not found: {", ".join(sorted(missing))}')
+                )
+                return
+
+        started = time.perf_counter()
+        created = rollups.rebuild(users=users, batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {created} monthly totals in {elapsed:.2f}s')
+        )
@@ -0,0 +1,167 @@
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from finance import rollups
+from finance.cache import bump_data_versions
+from finance.management.commands.setup_budgets import DEFAULT_BUDGETS, FALLBACK_BUDGET
+from finance.models import Budget, Category, Transaction
+from finance.utils import add_months, get_default_categories
+from calendar import monthrange
+from datetime import timedelta
+from decimal import Decimal
+import random
+import time
+
+SEED_PASSWORD = 'load-test-password'
+INSERT_BATCH_SIZE = 5000
+
+# (relative frequency, min amount, max amount) per default category
+TRANSACTION_PROFILE = {
+    'Salary': (4, 40000, 90000),
+    'Freelance': (2, 2000, 15000),
+    'Investments': (1, 500, 8000),
+    'Bonus': (0.5, 5000, 30000),
+    'Other Income': (1, 100, 3000),
+    'Groceries': (30, 150, 2500),
+    'Rent/Mortgage': (4, 12000, 18000),
+    'Utilities': (6, 300, 2500),
+    'Transportation': (20, 40, 1500),
+    'Entertainment': (8, 200, 2000),
+    'Dining Out': (18, 150, 1800),
+    'Shopping': (10, 300, 5000),
+    'Healthcare': (3, 200, 6000),
+    'Education': (2, 500, 8000),
+    'Travel': (2, 2000, 25000),
+    'Bills': (6, 300, 4000),
+    'Subscriptions': (6, 99, 999),
+    'Other Expenses': (5, 50, 2000),
+}
+DESCRIPTIONS = {
+    'Groceries': ['Supermarket', 'Vegetable market', 'Online grocery order', 'Bakery'],
+    'Transportation': ['Metro card top-up', 'Fuel', 'Cab ride', 'Bus pass'],
+    'Dining Out': ['Lunch', 'Dinner out', 'Coffee', 'Food delivery'],
+    'Shopping': ['Clothing', 'Electronics', 'Home goods', 'Online order'],
+    'Salary': ['Monthly salary'],
+    'Rent/Mortgage': ['Monthly rent'],
+}
+
+class Command(BaseCommand):
+    help = 'Bulk-generate load-test users with categories, monthly budgets and transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Users to create')
+        parser.add_argument('--transactions-per-user', type=int, default=1000, help='Transactions per user')
+        parser.add_argument('--years', type=int, default=2, help='Years of history, ending today')
+        parser.add_argument('--prefix', type=str, default='load-user-', help='Username prefix')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for repeatable data')
+        parser.add_argument('--batch-size', type=int, default=50, help='Users per committed chunk')
+        parser.add_argument('--reset', action='store_true', help='Delete existing users with the prefix first')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['transactions_per_user'] < 0 or options['years'] < 1:
+            raise CommandError('--users and --years must be at least 1, --transactions-per-user at least 0')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        existing = User.objects.filter(username__startswith=options['prefix'])
+        if existing.exists():
+            if not options['reset']:
+                raise CommandError(f'Users starting with "{options["prefix"]}" already exist; pass --reset to replace them')
+            existing.delete()
+
+        self.random = random.Random(options['seed'])
+        self.password = make_password(SEED_PASSWORD)  # Hash once; every load user shares it
+        today = timezone.now().date()
+        self.end_date = today
+        self.start_date = add_months(today.replace(day=1), -12 * options['years'] + 1)
+        self.months = []
+        month = self.start_date
+        while month <= today:
+            self.months.append(month)
+            month = add_months(month, 1)
+
+        started = time.perf_counter()
+        totals = {'users': 0, 'categories': 0, 'budgets': 0, 'transactions': 0}
+        for first in range(0, options['users'], options['batch_size']):
+            count = min(options['batch_size'], options['users'] - first)
+            with transaction.atomic():
+                counts = self.seed_chunk(first, count, options)
+            for key, value in counts.items():
+                totals[key] += value
+            self.stdout.write(f'  {totals["users"]}/{options["users"]} users, {totals["transactions"]} transactions')
+
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Created {totals["users"]} users, {totals["categories"]} categories, {totals["budgets"]} budgets '
+                f'and {totals["transactions"]} transactions ({self.start_date} to {self.end_date}) '
+                f'in {elapsed:.2f}s - {rows / elapsed if elapsed else 0:.0f} rows/sec. '
+                f'Password: {SEED_PASSWORD}'
+            )
+        )
+
+    def seed_chunk(self, first, count, options):
+        # bulk_create skips post_save, so default categories are created here too
+        users = User.objects.bulk_create([
+            User(username=f'{options["prefix"]}{i}', password=self.password, email=f'{options["prefix"]}{i}@example.com')
+            for i in range(first, first + count)
+        ])
+        categories = Category.objects.bulk_create([
+            Category(user=user, **category_data)
+            for user in users
+            for category_data in get_default_categories()
+        ], batch_size=INSERT_BATCH_SIZE)
+
+        by_user = {}
+        for category in categories:
+            by_user.setdefault(category.user_id, []).append(category)
+
+        budgets = Budget.objects.bulk_create([
+            Budget(
+                user_id=category.user_id,
+                category=category,
+                amount=DEFAULT_BUDGETS.get(category.name, FALLBACK_BUDGET),
+                start_date=month,
+                end_date=month.replace(day=monthrange(month.year, month.month)[1])
+            )
+            for category in categories if category.type == 'expense'
+            for month in self.months
+        ], batch_size=INSERT_BATCH_SIZE)
+
+        created = 0
+        batch = []
+        for user in users:
+            batch.extend(self.generate_transactions(user, by_user[user.pk], options['transactions_per_user']))
+            if len(batch) >= INSERT_BATCH_SIZE:
+                created += self.insert_transactions(batch)
+                batch = []
+        created += self.insert_transactions(batch)
+
+        bump_data_versions([user.pk for user in users])
+        return {'users': len(users), 'categories': len(categories), 'budgets': len(budgets), 'transactions': created}
+
+    def generate_transactions(self, user, categories, count):
+        weights = [TRANSACTION_PROFILE.get(category.name, (1, 100, 1000))[0] for category in categories]
+        days = (self.end_date - self.start_date).days
+        for category in self.random.choices(categories, weights=weights, k=count):
+            _, low, high = TRANSACTION_PROFILE.get(category.name, (1, 100, 1000))
+            descriptions = DESCRIPTIONS.get(category.name, [category.name])
+            yield Transaction(
+                user=user,
+                category=category,
+                amount=Decimal(self.random.randint(low * 100, high * 100)) / 100,
+                type=category.type,
+                description=self.random.choice(descriptions),
+                date=self.start_date + timedelta(days=self.random.randint(0, days))
+            )
+
+    def insert_transactions(self, batch):
+        if not batch:
+            return 0
+        transactions = Transaction.objects.bulk_create(batch, batch_size=INSERT_BATCH_SIZE)
+        # bulk_create skips model signals, so keep the rollup in step here
+        rollups.add_transactions(transactions)
+        return len(transactions)
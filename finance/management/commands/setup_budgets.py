@@ -1,81 +1,165 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.utils import timezone
+from finance.cache import bump_data_versions
 from finance.models import Category, Budget
-from datetime import date
+from finance.utils import add_months
+from datetime import datetime
+from itertools import chain
 from calendar import monthrange
+import time
+
+# Default budget amounts for expense categories
+DEFAULT_BUDGETS = {
+    'Groceries': 5000,
+    'Rent/Mortgage': 15000,
+    'Utilities': 3000,
+    'Transportation': 2000,
+    'Entertainment': 2000,
+    'Dining Out': 3000,
+    'Shopping': 3000,
+    'Healthcare': 2000,
+    'Education': 2000,
+    'Travel': 5000,
+    'Bills': 5000,
+    'Subscriptions': 1000,
+    'Other Expenses': 2000,
+}
+FALLBACK_BUDGET = 2000  # Default for unknown categories
 
 class Command(BaseCommand):
-    help = 'Set up default monthly budgets for categories'
+    help = 'Set up default monthly budgets for categories, for one user or every user'
 
     def add_arguments(self, parser):
-        parser.add_argument('username', type=str, help='Username to set up budgets for')
+        parser.add_argument('username', type=str, nargs='?', help='Username to set up budgets for')
+        parser.add_argument('--all-users', action='store_true', help='Set up budgets for every active user')
+        parser.add_argument('--month', type=str, help='Month to set up, as YYYY-MM (default: current month)')
+        parser.add_argument(
+            '--carry-forward', action='store_true',
+            help="Copy each category's budget from the previous month; categories without one get the default"
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Users per committed chunk')
 
     def handle(self, *args, **options):
-        try:
-            user = User.objects.get(username=options['username'])
-            
-            # Get current month's start and end dates
-            today = timezone.now().date()
-            start_date = today.replace(day=1)
-            _, last_day = monthrange(today.year, today.month)
-            end_date = today.replace(day=last_day)
-
-            # Default budget amounts for expense categories
-            default_budgets = {
-                'Groceries': 5000,
-                'Rent/Mortgage': 15000,
-                'Utilities': 3000,
-                'Transportation': 2000,
-                'Entertainment': 2000,
-                'Dining Out': 3000,
-                'Shopping': 3000,
-                'Healthcare': 2000,
-                'Education': 2000,
-                'Travel': 5000,
-                'Bills': 5000,
-                'Subscriptions': 1000,
-                'Other Expenses': 2000,
-            }
-
-            budgets_created = 0
-            budgets_updated = 0
-
-            # Get all expense categories for the user
-            categories = Category.objects.filter(user=user, type='expense')
-
-            for category in categories:
-                default_amount = default_budgets.get(category.name, 2000)  # Default 2000 for unknown categories
-                
-                # Try to get existing budget for this month
-                budget, created = Budget.objects.get_or_create(
-                    user=user,
-                    category=category,
-                    start_date__lte=end_date,
-                    end_date__gte=start_date,
-                    defaults={
-                        'amount': default_amount,
-                        'start_date': start_date,
-                        'end_date': end_date
-                    }
+        if bool(options['username']) == options['all_users']:
+            raise CommandError('Pass either a username or --all-users')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        start_date, end_date = self.get_month(options['month'])
+
+        user = None
+        if not options['all_users']:
+            try:
+                user = User.objects.get(username=options['username'])
+            except User.DoesNotExist:
+                self.stdout.write(
+                    self.style.ERROR(f'User with username {options["username"]} does not exist')
                 )
+                return
+
+        started = time.perf_counter()
+        users_processed = budgets_created = budgets_updated = 0
 
-                if created:
-                    budgets_created += 1
-                else:
-                    # Update existing budget if it was created with a different amount
-                    if budget.amount != default_amount:
-                        budget.amount = default_amount
-                        budget.save()
-                        budgets_updated += 1
+        for user_ids in self.user_chunks(options, user):
+            created, updated = self.process_chunk(user_ids, start_date, end_date, options)
+            users_processed += len(user_ids)
+            budgets_created += created
+            budgets_updated += updated
 
+        elapsed = time.perf_counter() - started
+        if options['all_users']:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Successfully created {budgets_created} budgets and updated {budgets_updated} budgets '
+                    f'for {users_processed} users ({start_date:%Y-%m}) in {elapsed:.2f}s - '
+                    f'{users_processed / elapsed if elapsed else 0:.0f} users/sec, '
+                    f'{(budgets_created + budgets_updated) / elapsed if elapsed else 0:.0f} budgets/sec'
+                )
+            )
+        else:
             self.stdout.write(
                 self.style.SUCCESS(
                     f'Successfully created {budgets_created} budgets and updated {budgets_updated} budgets for {user.username}'
                 )
             )
 
-        except User.DoesNotExist:
-            self.stdout.write(
-                self.style.ERROR(f'User with username {options["username"]} does not exist')
-            ) 
\ No newline at end of file
+    def get_month(self, month):
+        if month:
+            try:
+                start_date = datetime.strptime(month, '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--month must be in YYYY-MM format')
+        else:
+            start_date = timezone.now().date().replace(day=1)
+        _, last_day = monthrange(start_date.year, start_date.month)
+        return start_date, start_date.replace(day=last_day)
+
+    def user_chunks(self, options, user=None):
+        """Yield lists of user ids, walking the user table by primary key."""
+        if user is not None:
+            yield [user.pk]
+            return
+        last_pk = 0
+        while True:
+            user_ids = list(
+                User.objects.filter(is_active=True, pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not user_ids:
+                return
+            yield user_ids
+            last_pk = user_ids[-1]
+
+    def process_chunk(self, user_ids, start_date, end_date, options):
+        """Create or update one chunk of users' budgets with bulk writes in one transaction."""
+        categories = Category.objects.filter(user_id__in=user_ids, type='expense')
+
+        # Budgets already overlapping the target month, keyed by (user, category)
+        existing = {}
+        for budget in Budget.objects.filter(
+            user_id__in=user_ids,
+            start_date__lte=end_date,
+            end_date__gte=start_date
+        ).order_by('start_date'):
+            existing.setdefault((budget.user_id, budget.category_id), budget)
+
+        previous = {}
+        if options['carry_forward']:
+            previous_start = add_months(start_date, -1)
+            for budget in Budget.objects.filter(
+                user_id__in=user_ids,
+                start_date__lte=start_date - timezone.timedelta(days=1),
+                end_date__gte=previous_start
+            ).order_by('start_date'):
+                previous[(budget.user_id, budget.category_id)] = budget.amount
+
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        for category in categories:
+            key = (category.user_id, category.id)
+            amount = previous.get(key) or DEFAULT_BUDGETS.get(category.name, FALLBACK_BUDGET)
+            budget = existing.get(key)
+            if budget is None:
+                to_create.append(Budget(
+                    user_id=category.user_id,
+                    category=category,
+                    amount=amount,
+                    start_date=start_date,
+                    end_date=end_date
+                ))
+            elif budget.amount != amount:
+                budget.amount = amount
+                budget.updated_at = now  # bulk_update skips auto_now
+                to_update.append(budget)
+
+        with transaction.atomic():
+            Budget.objects.bulk_create(to_create, batch_size=options['batch_size'])
+            Budget.objects.bulk_update(to_update, ['amount', 'updated_at'], batch_size=options['batch_size'])
+        # Bulk writes skip the model signals, so invalidate the affected users' ETags here
+        bump_data_versions({budget.user_id for budget in chain(to_create, to_update)})
+
+        return len(to_create), len(to_update)
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from finance.routers import replica_alias
+import sqlite3
+import time
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database onto the read replica with the online backup API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0, help='Repeat every N seconds (0 runs once)')
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError('No read replica configured; set READ_REPLICA_NAME')
+
+        primary = settings.DATABASES['default']
+        replica = settings.DATABASES[alias]
+        if 'sqlite3' not in primary['ENGINE'] or 'sqlite3' not in replica['ENGINE']:
+            raise CommandError('sync_replica only supports SQLite primaries and replicas')
+
+        while True:
+            started = time.perf_counter()
+            source = sqlite3.connect(str(primary['NAME']))
+            target = sqlite3.connect(str(replica['NAME']))
+            try:
+                # One step copies every page under a single read snapshot of the primary.
+                # Stepwise copies restart whenever another connection writes to the primary,
+                # so on a busy primary they may never finish. Replica readers wait on
+                # busy_timeout while the copy holds the replica's write lock.
+                source.backup(target, pages=-1)
+            finally:
+                target.close()
+                source.close()
+            self.stdout.write(
+                self.style.SUCCESS(f'Synced {primary["NAME"]} -> {replica["NAME"]} in {time.perf_counter() - started:.2f}s')
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,380 @@
+import heapq
+import io
+import itertools
+import json
+import logging
+import time
+import zlib
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+
+from .routers import replica_alias, use_replica
+
+try:
+    import brotli
+except ImportError:  # Optional: without it responses are only gzip-compressed
+    brotli = None
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Only the API's own data formats are compressed. HTML (the browsable API and the
+# admin) puts a CSRF token next to reflected query input, which compression would
+# expose to BREACH; other types are already compressed or not worth it.
+COMPRESSIBLE_CONTENT_TYPES = (
+    'application/json', 'application/msgpack', 'application/x-ndjson', 'text/csv',
+)
+REQUEST_READ_SIZE = 64 * 1024
+SLOW_SQL_MAX_LENGTH = 2000
+
+performance_logger = logging.getLogger('finance.performance')
+
+
+class ReadReplicaMiddleware:
+    """Route read-only analytics requests to the read replica.
+
+    A request is sent to the replica when it is a safe method, its view/action is
+    listed in ``READ_REPLICA['VIEWS']`` and the client has not written within
+    ``READ_REPLICA['STICKY_SECONDS']``. Successful writes stamp the response with
+    a cookie and header holding the write time; clients that cannot keep cookies
+    can echo the header back so they read their own writes from primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.replica_token = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request.replica_token is not None:
+                use_replica.reset(request.replica_token)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            written_at = f'{time.time():.3f}'
+            options = settings.READ_REPLICA
+            response[options['HEADER']] = written_at
+            response.set_cookie(
+                options['COOKIE_NAME'], written_at,
+                max_age=options['STICKY_SECONDS'], httponly=True, samesite='Lax'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.use_replica_for(request, view_func):
+            request.replica_token = use_replica.set(True)
+        return None
+
+    def use_replica_for(self, request, view_func):
+        if request.method not in SAFE_METHODS or replica_alias() is None:
+            return False
+
+        view_class = getattr(view_func, 'cls', None)
+        if view_class is None:
+            return False
+        # ViewSets expose their method -> action mapping on the view function
+        actions = getattr(view_func, 'actions', None) or {}
+        action = actions.get(request.method.lower())
+        view_name = f'{view_class.__name__}.{action}' if action else view_class.__name__
+        if view_name not in settings.READ_REPLICA['VIEWS']:
+            return False
+
+        return not self.wrote_recently(request)
+
+    def wrote_recently(self, request):
+        options = settings.READ_REPLICA
+        header = 'HTTP_' + options['HEADER'].upper().replace('-', '_')
+        for value in (request.COOKIES.get(options['COOKIE_NAME']), request.META.get(header)):
+            try:
+                if time.time() - float(value) < options['STICKY_SECONDS']:
+                    return True
+            except (TypeError, ValueError):
+                continue
+        return False
+
+
+class GzipCompressor:
+    def __init__(self):
+        self.compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def process(self, data):
+        return self.compressor.compress(data)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self):
+        self.compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def process(self, data):
+        return self.compressor.process(data)
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+COMPRESSORS = {'gzip': GzipCompressor}
+if brotli is not None:
+    COMPRESSORS = {'br': BrotliCompressor, **COMPRESSORS}
+
+
+def choose_encoding(accept_encoding):
+    """Pick the best supported coding from an ``Accept-Encoding`` header, or None.
+
+    Honours q-values (including ``q=0`` and ``*``); ties prefer brotli.
+    """
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in COMPRESSORS:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class CompressionMiddleware:
+    """Compress API responses with brotli or gzip, and accept gzip request bodies.
+
+    Like Django's ``GZipMiddleware`` but negotiates brotli when the optional
+    ``brotli`` package is installed, skips bodies under ``COMPRESSION_MIN_SIZE``
+    and compresses streaming responses (exports) as they are produced. Only
+    ``COMPRESSIBLE_CONTENT_TYPES`` are compressed: HTML pages carry a CSRF token
+    alongside reflected input and would be open to BREACH, so rather than pad
+    them as ``GZipMiddleware`` does they are left uncompressed.
+
+    Request bodies sent with ``Content-Encoding: gzip`` are inflated before
+    the view parses them, up to ``COMPRESSION_MAX_REQUEST_SIZE`` bytes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        error = self.decompress_request(request)
+        if error is not None:
+            return error
+        return self.compress_response(request, self.get_response(request))
+
+    def decompress_request(self, request):
+        encoding = request.META.get('HTTP_CONTENT_ENCODING', '').strip().lower()
+        if encoding in ('', 'identity'):
+            return None
+        if encoding != 'gzip':
+            return JsonResponse({
+                'error': f'Unsupported Content-Encoding: {encoding}',
+                'message': 'Request bodies may only be gzip-encoded'
+            }, status=415)
+
+        limit = settings.COMPRESSION_MAX_REQUEST_SIZE
+        decompressor = zlib.decompressobj(31)
+        body = bytearray()
+        try:
+            while True:
+                chunk = request.read(REQUEST_READ_SIZE)
+                if not chunk:
+                    break
+                body += decompressor.decompress(chunk, limit + 1 - len(body))
+                if len(body) > limit or decompressor.unconsumed_tail:
+                    return JsonResponse({
+                        'error': f'Decompressed body exceeds {limit} bytes',
+                        'message': 'Request body too large'
+                    }, status=413)
+            body += decompressor.flush()
+            if not decompressor.eof:
+                raise zlib.error('incomplete gzip stream')
+        except zlib.error as e:
+            return JsonResponse({
+                'error': str(e),
+                'message': 'Invalid gzip request body'
+            }, status=400)
+
+        # Hand the view the plain body as if it had been sent uncompressed
+        request._stream = io.BytesIO(bytes(body))
+        request._read_started = False
+        request.META['CONTENT_LENGTH'] = str(len(body))
+        del request.META['HTTP_CONTENT_ENCODING']
+        return None
+
+    def compress_response(self, request, response):
+        if response.status_code in (204, 304) or response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in COMPRESSIBLE_CONTENT_TYPES:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressor = COMPRESSORS[encoding]()
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.acompress_stream(compressor, response.streaming_content)
+            else:
+                response.streaming_content = self.compress_stream(compressor, response.streaming_content)
+            # The compressed size isn't known until the stream ends
+            del response.headers['Content-Length']
+        else:
+            content = compressor.process(response.content) + compressor.finish()
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        # A strong ETag would promise byte-identical bodies across codings
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def compress_stream(self, compressor, chunks):
+        # Yield whenever the compressor emits a block rather than flushing every
+        # chunk: exports stream one row per chunk, and per-row flushes ruin the ratio
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+
+    async def acompress_stream(self, compressor, chunks):
+        async for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class RequestMetrics:
+    """Timings for one request; SQL is timed by ``execute_wrapper`` on every connection."""
+
+    def __init__(self, top_n):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.top_n = top_n
+        self.slowest = []  # min-heap of (duration, sequence, sql)
+        self.sequence = itertools.count()
+        self.view_started = self.view_ended = self.render_ended = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += duration
+            if self.top_n > 0:
+                entry = (duration, next(self.sequence), sql[:SLOW_SQL_MAX_LENGTH])
+                if len(self.slowest) < self.top_n:
+                    heapq.heappush(self.slowest, entry)
+                else:
+                    heapq.heappushpop(self.slowest, entry)
+
+    def mark_rendered(self, response):
+        self.render_ended = time.perf_counter()
+
+    def timings(self, finished):
+        """Milliseconds spent in the database, the view, rendering and in total."""
+        view_ended = self.view_ended or finished
+        timings = {'db': self.db_time * 1000, 'total': (finished - self.started) * 1000}
+        if self.view_started is not None:
+            timings['view'] = (view_ended - self.view_started) * 1000
+        if self.view_ended is not None and self.render_ended is not None:
+            timings['render'] = (self.render_ended - self.view_ended) * 1000
+        return timings
+
+
+request_metrics = ContextVar('finance_request_metrics', default=None)
+
+
+class PerformanceMiddleware:
+    """Measure each request's SQL count, DB time, view time and render time.
+
+    ``view`` covers the view itself, including serializer work; ``render`` is
+    turning the response data into bytes. With ``SERVER_TIMING`` the numbers go
+    out in a ``Server-Timing`` header. Requests slower than ``SLOW_REQUEST_MS``
+    or running more than ``SLOW_REQUEST_QUERIES`` queries are logged as one JSON
+    line on the ``finance.performance`` logger, with their ``SLOW_REQUEST_TOP_SQL``
+    slowest statements. Queries run while a streaming body is consumed happen
+    after the response leaves and are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics(settings.SLOW_REQUEST_TOP_SQL)
+        token = request_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            request_metrics.reset(token)
+
+        timings = metrics.timings(time.perf_counter())
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = ', '.join(
+                f'{name};dur={duration:.1f}' + (f';desc="{metrics.queries} queries"' if name == 'db' else '')
+                for name, duration in timings.items()
+            )
+        if timings['total'] >= settings.SLOW_REQUEST_MS or metrics.queries >= settings.SLOW_REQUEST_QUERIES:
+            self.log_slow_request(request, response, metrics, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = request_metrics.get()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+        return None
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook, so the view is done here
+        metrics = request_metrics.get()
+        if metrics is not None:
+            metrics.view_ended = time.perf_counter()
+            response.add_post_render_callback(metrics.mark_rendered)
+        return response
+
+    def log_slow_request(self, request, response, metrics, timings):
+        performance_logger.warning(json.dumps({
+            'event': 'slow_request',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'user_id': getattr(getattr(request, 'user', None), 'pk', None),
+            'queries': metrics.queries,
+            **{f'{name}_ms': round(duration, 2) for name, duration in timings.items()},
+            'slowest_sql': [
+                {'ms': round(duration * 1000, 2), 'sql': sql}
+                for duration, _, sql in sorted(metrics.slowest, reverse=True)
+            ],
+        }))
@@ -59,6 +59,7 @@ def remove_default_categories(apps, schema_editor):
 class Migration(migrations.Migration):
     dependencies = [
         ('finance', '0001_initial'),
+        ('finance', '0002_category_type'),
     ]
 
     operations = [
@@ -0,0 +1,69 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_monthly_totals(apps, schema_editor):
+    Transaction = apps.get_model('finance', 'Transaction')
+    MonthlyCategoryTotal = apps.get_model('finance', 'MonthlyCategoryTotal')
+
+    rows = Transaction.objects.annotate(
+        rollup_month=TruncMonth('date')
+    ).values(
+        'user_id', 'category_id', 'rollup_month', 'type'
+    ).annotate(
+        rollup_total=Sum('amount'),
+        rollup_count=Count('id')
+    ).order_by()
+
+    MonthlyCategoryTotal.objects.bulk_create([
+        MonthlyCategoryTotal(
+            user_id=row['user_id'],
+            category_id=row['category_id'],
+            month=row['rollup_month'],
+            type=row['type'],
+            total=row['rollup_total'],
+            count=row['rollup_count']
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0004_transaction_budget_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCategoryTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('type', models.CharField(choices=[('income', 'Income'), ('expense', 'Expense')], max_length=7)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='finance.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-month'],
+                'indexes': [models.Index(fields=['user', 'month', 'type'], name='monthly_total_user_month_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='monthlycategorytotal',
+            constraint=models.UniqueConstraint(fields=('user', 'category', 'month', 'type'), name='monthly_total_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlycategorytotal',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('user', 'month', 'type'), name='monthly_total_uncategorised_unique'),
+        ),
+        migrations.RunPython(backfill_monthly_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+from django.db import migrations
+
+# FTS5 index over transaction descriptions and category names. Triggers keep it in
+# sync with every write path, including bulk_create and the SET NULL on category
+# delete. Note: SQLite drops these triggers if a later migration rebuilds
+# finance_transaction or finance_category, so such migrations must re-create them.
+
+CREATE_SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE finance_transaction_search USING fts5(
+        description, category_name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    INSERT INTO finance_transaction_search(rowid, description, category_name)
+    SELECT t.id, t.description, COALESCE(c.name, '')
+    FROM finance_transaction t LEFT JOIN finance_category c ON c.id = t.category_id
+    """,
+    """
+    CREATE TRIGGER finance_transaction_search_insert AFTER INSERT ON finance_transaction BEGIN
+        INSERT INTO finance_transaction_search(rowid, description, category_name)
+        VALUES (new.id, new.description,
+                COALESCE((SELECT name FROM finance_category WHERE id = new.category_id), ''));
+    END
+    """,
+    """
+    CREATE TRIGGER finance_transaction_search_delete AFTER DELETE ON finance_transaction BEGIN
+        DELETE FROM finance_transaction_search WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER finance_transaction_search_update
+    AFTER UPDATE OF description, category_id ON finance_transaction BEGIN
+        UPDATE finance_transaction_search
+        SET description = new.description,
+            category_name = COALESCE((SELECT name FROM finance_category WHERE id = new.category_id), '')
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER finance_category_search_update AFTER UPDATE OF name ON finance_category BEGIN
+        UPDATE finance_transaction_search SET category_name = new.name
+        WHERE rowid IN (SELECT id FROM finance_transaction WHERE category_id = new.id);
+    END
+    """,
+]
+
+DROP_SEARCH_INDEX = [
+    'DROP TRIGGER IF EXISTS finance_category_search_update',
+    'DROP TRIGGER IF EXISTS finance_transaction_search_update',
+    'DROP TRIGGER IF EXISTS finance_transaction_search_delete',
+    'DROP TRIGGER IF EXISTS finance_transaction_search_insert',
+    'DROP TABLE IF EXISTS finance_transaction_search',
+]
+
+
+def fts5_available(schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def create_search_index(apps, schema_editor):
+    # Other backends keep the icontains search in finance.search
+    if not fts5_available(schema_editor):
+        return
+    for statement in CREATE_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0005_monthly_category_total'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,76 @@
+import importlib
+
+from django.db import migrations
+
+# Adds an UNINDEXED user_id to the FTS5 index so a search only ranks and joins the
+# caller's matches. FTS5 tables can't be altered, so the table and its triggers
+# are rebuilt. The same note as 0006 applies: SQLite drops these triggers if a
+# later migration rebuilds finance_transaction or finance_category.
+
+CREATE_SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE finance_transaction_search USING fts5(
+        user_id UNINDEXED, description, category_name,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    INSERT INTO finance_transaction_search(rowid, user_id, description, category_name)
+    SELECT t.id, t.user_id, t.description, COALESCE(c.name, '')
+    FROM finance_transaction t LEFT JOIN finance_category c ON c.id = t.category_id
+    """,
+    """
+    CREATE TRIGGER finance_transaction_search_insert AFTER INSERT ON finance_transaction BEGIN
+        INSERT INTO finance_transaction_search(rowid, user_id, description, category_name)
+        VALUES (new.id, new.user_id, new.description,
+                COALESCE((SELECT name FROM finance_category WHERE id = new.category_id), ''));
+    END
+    """,
+    """
+    CREATE TRIGGER finance_transaction_search_delete AFTER DELETE ON finance_transaction BEGIN
+        DELETE FROM finance_transaction_search WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER finance_transaction_search_update
+    AFTER UPDATE OF user_id, description, category_id ON finance_transaction BEGIN
+        UPDATE finance_transaction_search
+        SET user_id = new.user_id,
+            description = new.description,
+            category_name = COALESCE((SELECT name FROM finance_category WHERE id = new.category_id), '')
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER finance_category_search_update AFTER UPDATE OF name ON finance_category BEGIN
+        UPDATE finance_transaction_search SET category_name = new.name
+        WHERE rowid IN (SELECT id FROM finance_transaction WHERE category_id = new.id);
+    END
+    """,
+]
+
+previous = importlib.import_module('finance.migrations.0006_transaction_search')
+
+
+def rebuild_search_index(statements):
+    def operation(apps, schema_editor):
+        # Other backends keep the icontains search in finance.search
+        if not previous.fts5_available(schema_editor):
+            return
+        for statement in previous.DROP_SEARCH_INDEX + statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0006_transaction_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            rebuild_search_index(CREATE_SEARCH_INDEX),
+            rebuild_search_index(previous.CREATE_SEARCH_INDEX)
+        ),
+    ]
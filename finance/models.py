@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 
@@ -39,10 +39,31 @@ class Transaction(models.Model):
 
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            # List endpoint, dashboard and trends: user + date range, newest first
+            models.Index(fields=['user', '-date', '-created_at'], name='transaction_user_date_idx'),
+            # Type-filtered aggregates (dashboard categories, budget summary)
+            models.Index(fields=['user', 'type', 'date'], name='transaction_user_type_date_idx'),
+            # Per-category budget spending and the category filter
+            models.Index(fields=['user', 'category', 'date'], name='transaction_user_cat_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.type} - {self.amount} - {self.description[:30]}"
 
+    def save(self, *args, **kwargs):
+        # The rollup receivers (finance.signals) must commit or roll back with the row
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        # The collector's own transaction doesn't use a savepoint, so a failed rollup
+        # update would break an enclosing transaction instead of just this delete
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            return super().delete(*args, **kwargs)
+
 class Budget(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
@@ -54,6 +75,42 @@ class Budget(models.Model):
 
     class Meta:
         ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['user', '-start_date'], name='budget_user_start_idx'),
+            # Overlap check for a category's budget window
+            models.Index(fields=['user', 'category', 'start_date', 'end_date'], name='budget_user_cat_dates_idx'),
+        ]
 
     def __str__(self):
         return f"{self.category.name} - {self.amount}"
+
+class MonthlyCategoryTotal(models.Model):
+    """Running sum and count of a user's transactions per category, month and type.
+
+    Maintained incrementally from ``Transaction`` writes (see ``finance.rollups``)
+    and rebuilt from scratch with ``manage.py rebuild_monthly_totals``.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True)
+    month = models.DateField()
+    type = models.CharField(max_length=7, choices=Transaction.TRANSACTION_TYPES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-month']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'category', 'month', 'type'], name='monthly_total_unique'),
+            # NULLs are distinct in unique indexes, so uncategorised rows need their own constraint
+            models.UniqueConstraint(
+                fields=['user', 'month', 'type'],
+                condition=models.Q(category__isnull=True),
+                name='monthly_total_uncategorised_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'month', 'type'], name='monthly_total_user_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%b %Y} - {self.type} - {self.total}"
@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+POSITION_SEPARATOR = '|'
+INCLUSIVE_LOOKUPS = {'lt': 'lte', 'gt': 'gte'}
+
+
+class TransactionCursorPagination(CursorPagination):
+    """Keyset pagination over the transaction list.
+
+    The cursor carries the whole ``(date, created_at, id)`` key of the row a
+    page ends on, and the next page seeks strictly past it. DRF's own cursor
+    only seeks on the first ordering field and skips rows sharing a date with
+    OFFSET (capped at ``offset_cutoff``); here every page is a seek, so deep
+    pages and dates with thousands of rows cost the same as the first page.
+    """
+    ordering = ('-date', '-created_at', '-id')
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return settings.TRANSACTION_MAX_PAGE_SIZE
+
+    @classmethod
+    def requested(cls, request):
+        """Cursor mode is opt-in with ``?pagination=cursor`` (kept by the next/previous links)."""
+        return request.query_params.get('pagination') == 'cursor' or cls.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        current_position = self.cursor.position if self.cursor is not None else None
+
+        # Positions are unique, so unlike DRF there is never an offset to apply
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            queryset = queryset.filter(self.seek(ordering, self.parse_position(queryset.model, current_position)))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = current_position is not None, current_position
+            self.has_previous, self.previous_position = following_position is not None, following_position
+        else:
+            self.has_next, self.next_position = following_position is not None, following_position
+            self.has_previous, self.previous_position = current_position is not None, current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def seek(self, ordering, values):
+        """Rows strictly after ``values`` in ``ordering``, i.e. the row-value comparison
+        ``(date, created_at, id) < (d, c, i)`` spelled out as an OR of prefixes.
+
+        The leading field is also bounded on its own so the index range scan starts
+        at the cursor.
+        """
+        fields = [(field.lstrip('-'), 'lt' if field.startswith('-') else 'gt') for field in ordering]
+        condition = Q()
+        equal = {}
+        for (name, lookup), value in zip(fields, values):
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        name, lookup = fields[0]
+        return Q(**{f'{name}__{INCLUSIVE_LOOKUPS[lookup]}': values[0]}) & condition
+
+    def parse_position(self, model, position):
+        values = position.split(POSITION_SEPARATOR)
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        return POSITION_SEPARATOR.join(values)
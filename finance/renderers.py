@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import renderers
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional: ORJSONRenderer falls back to DRF's JSONRenderer
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional: MessagePackRenderer is only enabled when installed
+    msgpack = None
+
+# DRF's rules for types neither library knows (Decimal -> float, datetime -> ISO 8601
+# with "Z", QuerySet -> list, ...), so every format encodes values the same way
+encode_default = JSONEncoder().default
+
+
+class CSVRenderer(renderers.BaseRenderer):
+    """Selects ``?format=csv``; streaming views write their own body.
+
+    Only non-streaming responses such as errors are rendered here.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if rows and isinstance(rows[0], dict):
+            writer.writerow(rows[0].keys())
+            for row in rows:
+                writer.writerow(row.values())
+        else:
+            writer.writerows([row] for row in rows)
+        return buffer.getvalue().encode(self.charset)
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    """Selects ``?format=ndjson``; streaming views write their own body.
+
+    Only non-streaming responses such as errors are rendered here.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(
+            json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in rows
+        ).encode(self.charset)
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """``JSONRenderer`` backed by orjson when it is installed.
+
+    Produces the same compact UTF-8 JSON as DRF's renderer, U+2028/U+2029 escapes
+    included, except for floats: exponents are spelled ``1e16`` rather than
+    ``1e+16`` (the same value), and NaN or infinity render as ``null`` instead of
+    raising. Amounts are Decimals, which both encode as plain floats. Integers
+    beyond 64 bits, indented output (``Accept: application/json; indent=4``, the
+    browsable API) and non-default JSON settings go through DRF's renderer.
+    """
+    options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            or not (api_settings.COMPACT_JSON and api_settings.UNICODE_JSON and api_settings.STRICT_JSON)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        try:
+            rendered = orjson.dumps(data, default=encode_default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # DRF escapes these line separators, which are not valid in JavaScript strings
+        return rendered.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """Renders ``application/msgpack`` (requires the optional ``msgpack`` package)."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
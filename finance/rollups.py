@@ -0,0 +1,179 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import MonthlyCategoryTotal, Transaction
+
+REBUILD_BATCH_SIZE = 1000
+BULK_BATCH_SIZE = 500
+SMALL_DELTA_BATCH = 2
+
+
+def rollup_key(user_id, category_id, date, type):
+    return (user_id, category_id, date.replace(day=1), type)
+
+
+def transaction_key(instance):
+    date = Transaction._meta.get_field('date').to_python(instance.date)
+    return rollup_key(instance.user_id, instance.category_id, date, instance.type)
+
+
+def transaction_amount(instance):
+    return Transaction._meta.get_field('amount').to_python(instance.amount)
+
+
+def apply_deltas(deltas):
+    """Apply ``{(user_id, category_id, month, type): (amount, count)}`` to the rollup table."""
+    deltas = {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+    if not deltas:
+        return
+    with transaction.atomic():
+        if len(deltas) <= SMALL_DELTA_BATCH:
+            for key, delta in deltas.items():
+                apply_delta(key, delta)
+            return
+
+        # Large batches (bulk imports): one read, one bulk UPDATE and one bulk INSERT
+        existing = MonthlyCategoryTotal.objects.filter(
+            user_id__in={key[0] for key in deltas},
+            month__in={key[2] for key in deltas}
+        )
+        rows = []
+        for row in existing:
+            delta = deltas.pop((row.user_id, row.category_id, row.month, row.type), None)
+            if delta is not None:
+                row.total = F('total') + delta[0]
+                row.count = F('count') + delta[1]
+                rows.append(row)
+        MonthlyCategoryTotal.objects.bulk_update(rows, ['total', 'count'], batch_size=BULK_BATCH_SIZE)
+
+        try:
+            with transaction.atomic():
+                MonthlyCategoryTotal.objects.bulk_create([
+                    MonthlyCategoryTotal(
+                        user_id=user_id, category_id=category_id, month=month, type=type,
+                        total=amount, count=count
+                    )
+                    for (user_id, category_id, month, type), (amount, count) in deltas.items()
+                ], batch_size=BULK_BATCH_SIZE)
+        except IntegrityError:
+            # Another writer created some of these rows concurrently
+            for key, delta in deltas.items():
+                apply_delta(key, delta)
+
+
+def apply_delta(key, delta):
+    user_id, category_id, month, type = key
+    amount, count = delta
+    lookup = {'user_id': user_id, 'category_id': category_id, 'month': month, 'type': type}
+    updated = MonthlyCategoryTotal.objects.filter(**lookup).update(
+        total=F('total') + amount, count=F('count') + count
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            MonthlyCategoryTotal.objects.create(total=amount, count=count, **lookup)
+    except IntegrityError:
+        # Another writer created the row between our update and insert
+        MonthlyCategoryTotal.objects.filter(**lookup).update(
+            total=F('total') + amount, count=F('count') + count
+        )
+
+
+def add_transactions(transactions, sign=1):
+    """Fold a batch of transactions into the rollup, e.g. after ``bulk_create``."""
+    deltas = defaultdict(lambda: (Decimal('0'), 0))
+    for instance in transactions:
+        key = transaction_key(instance)
+        amount, count = deltas[key]
+        deltas[key] = (amount + sign * transaction_amount(instance), count + sign)
+    apply_deltas(deltas)
+
+
+def remove_transactions(transactions):
+    add_transactions(transactions, sign=-1)
+
+
+def move_transaction(previous, instance):
+    """Move a transaction's contribution after an update (amount, date, category or type)."""
+    deltas = defaultdict(lambda: (Decimal('0'), 0))
+    old_key = rollup_key(previous['user_id'], previous['category_id'], previous['date'], previous['type'])
+    amount, count = deltas[old_key]
+    deltas[old_key] = (amount - previous['amount'], count - 1)
+    new_key = transaction_key(instance)
+    amount, count = deltas[new_key]
+    deltas[new_key] = (amount + transaction_amount(instance), count + 1)
+    apply_deltas(deltas)
+
+
+def uncategorise(category):
+    """Merge a category's rows into the uncategorised bucket before it is deleted.
+
+    Mirrors ``Transaction.category``'s ``on_delete=SET_NULL``.
+    """
+    rows = list(MonthlyCategoryTotal.objects.filter(category=category))
+    deltas = {
+        (row.user_id, None, row.month, row.type): (row.total, row.count)
+        for row in rows
+    }
+    with transaction.atomic():
+        MonthlyCategoryTotal.objects.filter(pk__in=[row.pk for row in rows]).delete()
+        apply_deltas(deltas)
+
+
+def rebuild(users=None, batch_size=REBUILD_BATCH_SIZE):
+    """Recompute the rollup from the transaction table, optionally for some users only."""
+    transactions = Transaction.objects.all()
+    totals = MonthlyCategoryTotal.objects.all()
+    if users is not None:
+        transactions = transactions.filter(user__in=users)
+        totals = totals.filter(user__in=users)
+
+    rows = transactions.annotate(
+        rollup_month=TruncMonth('date')
+    ).values(
+        'user_id', 'category_id', 'rollup_month', 'type'
+    ).annotate(
+        rollup_total=Sum('amount'),
+        rollup_count=Count('id')
+    ).order_by()
+
+    created = 0
+    with transaction.atomic():
+        totals.delete()
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(MonthlyCategoryTotal(
+                user_id=row['user_id'],
+                category_id=row['category_id'],
+                month=row['rollup_month'],
+                type=row['type'],
+                total=row['rollup_total'],
+                count=row['rollup_count']
+            ))
+            if len(batch) >= batch_size:
+                MonthlyCategoryTotal.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        MonthlyCategoryTotal.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def covers_whole_months(start_date, end_date):
+    """True when ``start_date..end_date`` is a run of complete calendar months."""
+    return start_date.day == 1 and start_date <= end_date and (end_date + timedelta(days=1)).day == 1
+
+
+def monthly_totals(user, start_date, end_date):
+    """Rollup rows for ``user`` in the whole-month range ``start_date..end_date``."""
+    return MonthlyCategoryTotal.objects.filter(
+        user=user,
+        month__range=[start_date, end_date.replace(day=1)],
+        count__gt=0
+    )
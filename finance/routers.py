@@ -0,0 +1,44 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Set by ReadReplicaMiddleware for the duration of a request that may read from the replica
+use_replica = ContextVar('finance_use_replica', default=False)
+
+
+def replica_alias():
+    """The configured replica alias, or None when no replica database is set up."""
+    alias = settings.READ_REPLICA.get('ALIAS')
+    if alias and alias in settings.DATABASES:
+        return alias
+    return None
+
+
+def reading_from_replica():
+    """True inside a request whose reads the router sends to the replica."""
+    return use_replica.get() and replica_alias() is not None
+
+
+class ReadReplicaRouter:
+    """Send reads to the replica inside requests the middleware marked as replica-safe.
+
+    Everything else, and every write, stays on ``default``.
+    """
+
+    def db_for_read(self, model, **hints):
+        if use_replica.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica is a copy of default, so objects from either may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is refreshed from default with sync_replica, never migrated itself
+        if db == settings.READ_REPLICA.get('ALIAS'):
+            return False
+        return None
@@ -0,0 +1,51 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+SEARCH_TABLE = 'finance_transaction_search'
+SEARCH_TERM = re.compile(r'\w+', re.UNICODE)
+
+_search_table_available = {}
+
+
+def has_search_index(alias):
+    """True when ``alias`` is SQLite and the FTS5 table from migration 0006 exists."""
+    if alias not in _search_table_available:
+        connection = connections[alias]
+        _search_table_available[alias] = (
+            connection.vendor == 'sqlite'
+            and SEARCH_TABLE in connection.introspection.table_names()
+        )
+    return _search_table_available[alias]
+
+
+def build_match_query(value):
+    """Turn free text into an FTS5 query: every word must match as a prefix."""
+    return ' '.join(f'"{term}"*' for term in SEARCH_TERM.findall(value))
+
+
+def search_transactions(queryset, value, user_id):
+    """Filter ``user_id``'s transactions by description or category name, best matches first.
+
+    Uses the FTS5 index on SQLite and falls back to ``icontains`` elsewhere.
+    """
+    match = build_match_query(value)
+    if not match or not has_search_index(queryset.db):
+        return queryset.filter(
+            Q(description__icontains=value) |
+            Q(category__name__icontains=value)
+        )
+
+    # One join against the index: MATCH drives the lookup, user_id keeps other
+    # users' matches out of the join, and rank comes from the same row
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[
+            f'{SEARCH_TABLE} MATCH %s',
+            f'{SEARCH_TABLE}.user_id = %s',
+            f'{SEARCH_TABLE}.rowid = "finance_transaction"."id"',
+        ],
+        params=[match, user_id],
+        select={'search_rank': f'{SEARCH_TABLE}.rank'},
+    ).order_by('search_rank', '-date', '-created_at')
@@ -1,14 +1,53 @@
-from rest_framework import serializers
+from functools import lru_cache
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from django.contrib.auth.models import User
 from .models import Category, Transaction, Budget
 
+SPARSE_FIELD_METHODS = ('GET', 'HEAD')
+
+
+def requested_fields(field_names, query_params):
+    """The subset of ``field_names`` chosen with ``?fields=`` / ``?exclude=``, or None for all.
+
+    Keeps the serializer's field order; unknown names are a validation error.
+    """
+    fields = [name.strip() for name in query_params.get('fields', '').split(',') if name.strip()]
+    exclude = [name.strip() for name in query_params.get('exclude', '').split(',') if name.strip()]
+    if not fields and not exclude:
+        return None
+    unknown = sorted(set(fields + exclude) - set(field_names))
+    if unknown:
+        raise serializers.ValidationError({
+            'fields': f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(field_names)}"
+        })
+    return tuple(
+        name for name in field_names
+        if (not fields or name in fields) and name not in exclude
+    )
+
+
+class SparseFieldsMixin:
+    """Drop the fields a GET request leaves out with ``?fields=`` / ``?exclude=``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SPARSE_FIELD_METHODS:
+            return
+        names = requested_fields(list(self.fields), request.query_params)
+        if names is not None:
+            for name in set(self.fields) - set(names):
+                self.fields.pop(name)
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name')
         read_only_fields = ('id',)
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ('id', 'name', 'description', 'type', 'created_at', 'updated_at')
@@ -18,7 +57,34 @@ class CategorySerializer(serializers.ModelSerializer):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
-class TransactionSerializer(serializers.ModelSerializer):
+class UserCategoryField(serializers.PrimaryKeyRelatedField):
+    """Category lookup restricted to the requesting user's own categories.
+
+    Bulk requests put a prefetched ``category_map`` (``{pk: Category}``) in the
+    serializer context so every item resolves without its own query.
+    """
+
+    def get_queryset(self):
+        request = self.context.get('request')
+        if request is None:
+            return Category.objects.all()
+        return Category.objects.filter(user=request.user)
+
+    def to_internal_value(self, data):
+        category_map = self.context.get('category_map')
+        if category_map is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return category_map[int(data)]
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+
+class TransactionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    category = UserCategoryField(allow_null=True, required=False)
     category_name = serializers.CharField(source='category.name', read_only=True)
 
     class Meta:
@@ -31,7 +97,7 @@ class TransactionSerializer(serializers.ModelSerializer):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
-class BudgetSerializer(serializers.ModelSerializer):
+class BudgetSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     spent_amount = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     remaining_amount = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
@@ -52,3 +118,69 @@ class DashboardSerializer(serializers.Serializer):
     net_savings = serializers.DecimalField(max_digits=10, decimal_places=2)
     expenses_by_category = serializers.DictField()
     recent_transactions = TransactionSerializer(many=True)
+
+class ValuesRepresentation:
+    """Turn ``.values()`` rows into the dicts a ModelSerializer would produce.
+
+    Read-only list endpoints skip per-instance field machinery: each field is
+    compiled into a ``(name, lookup, converter, skip_null)`` step. Plain string,
+    integer and primary key fields pass through, ISO 8601 datetimes resolve the
+    active timezone once per batch instead of once per value, and everything else
+    (decimals, dates, choices) reuses the field's own ``to_representation`` so
+    the output stays identical.
+    """
+    PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.PrimaryKeyRelatedField)
+
+    def __init__(self, serializer_class, field_names=None):
+        fields = serializer_class().fields
+        self.fields = []
+        for name, field in fields.items():
+            if field.write_only or (field_names is not None and name not in field_names):
+                continue
+            source_attrs = field.source.split('.')
+            # A dotted source through a null relation is omitted, as DRF does with SkipField
+            self.fields.append((name, '__'.join(source_attrs), field, len(source_attrs) > 1))
+        self.lookups = tuple(dict.fromkeys(lookup for _, lookup, _, _ in self.fields))
+
+    def converter(self, field):
+        if isinstance(field, self.PASSTHROUGH_FIELDS):
+            return None
+        if isinstance(field, serializers.DateTimeField):
+            return self.datetime_converter(field)
+        return field.to_representation
+
+    def datetime_converter(self, field):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if field_timezone is None or output_format is None or output_format.lower() != ISO_8601:
+            return field.to_representation
+
+        def convert(value):
+            if value.tzinfo is None:
+                return field.to_representation(value)
+            text = value.astimezone(field_timezone).isoformat()
+            return text[:-6] + 'Z' if text.endswith('+00:00') else text
+        return convert
+
+    def to_representation(self, rows):
+        steps = [(name, lookup, self.converter(field), skip_null) for name, lookup, field, skip_null in self.fields]
+        data = []
+        for row in rows:
+            item = {}
+            for name, lookup, converter, skip_null in steps:
+                value = row[lookup]
+                if value is None:
+                    if not skip_null:
+                        item[name] = None
+                elif converter is None:
+                    item[name] = value
+                else:
+                    item[name] = converter(value)
+            data.append(item)
+        return data
+
+
+@lru_cache(maxsize=256)
+def values_representation(serializer_class, field_names=None):
+    """Cached ``ValuesRepresentation`` per serializer class and field subset."""
+    return ValuesRepresentation(serializer_class, field_names)
@@ -1,20 +1,92 @@
-from django.db.models.signals import post_save
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Category
-from .utils import get_default_categories
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from . import rollups
+from .authentication import user_cache
+from .blacklist import blacklist_filter
+from .cache import bump_auth_stamp_on_commit, bump_data_version_on_commit
+from .db import configure_sqlite_connection
+from .models import Budget, Category, Transaction
+from .utils import create_default_categories
+
+connection_created.connect(configure_sqlite_connection, dispatch_uid='finance_sqlite_pragmas')
 
 @receiver(post_save, sender=User)
 def create_user_categories(sender, instance, created, **kwargs):
     if created:  # Only for newly created users
-        # Get default categories from utils
-        default_categories = get_default_categories()
-        
-        # Create default categories for the new user
-        for category_data in default_categories:
-            Category.objects.create(
-                name=category_data['name'],
-                description=category_data['description'],
-                type=category_data['type'],
-                user=instance
-            ) 
\ No newline at end of file
+        # A brand new user has no categories, so skip the existence check
+        create_default_categories(instance)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, using=None, **kwargs):
+    # Deactivation, password changes and deletes must not be served from the auth cache,
+    # in this process right away and in the others once the save commits
+    user_cache.invalidate(instance.pk)
+    bump_auth_stamp_on_commit(instance.pk, using=using)
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_to_blacklist_filter(sender, instance, created, **kwargs):
+    # Refreshes served by this process see the logout immediately, without waiting for a sync
+    if created:
+        blacklist_filter.add(instance.token.jti)
+
+def deleting_user(origin):
+    """True when a delete cascades from a ``User`` instance or queryset."""
+    return isinstance(origin, User) or getattr(origin, 'model', None) is User
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Budget)
+@receiver(post_delete, sender=Budget)
+def invalidate_user_data_cache(sender, instance, origin=None, using=None, **kwargs):
+    # A deleted user's cached data can never be read again
+    if deleting_user(origin):
+        return
+    # Cascades send one signal per row; bump each affected user once per delete
+    if origin is not None:
+        bumped = origin.__dict__.setdefault('_finance_bumped_users', set())
+        if instance.user_id in bumped:
+            return
+        bumped.add(instance.user_id)
+    # Any change to a user's finance data invalidates their cached dashboards and ETags
+    bump_data_version_on_commit(instance.user_id, using=using)
+
+@receiver(pre_save, sender=Transaction)
+def remember_rollup_position(sender, instance, raw=False, using=None, **kwargs):
+    # Capture where the row currently counts so post_save can move it. Transaction.save
+    # is atomic, so the row stays locked until the rollup has moved and two concurrent
+    # edits can't both subtract the same old amount (SQLite, without row locks, fails
+    # the later of two overlapping write transactions instead).
+    instance._rollup_previous = None
+    if instance.pk is not None and not raw:
+        instance._rollup_previous = Transaction.objects.using(using).select_for_update().filter(
+            pk=instance.pk
+        ).values('user_id', 'category_id', 'date', 'type', 'amount').first()
+
+@receiver(post_save, sender=Transaction)
+def update_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous is None:
+        rollups.add_transactions([instance])
+    else:
+        rollups.move_transaction(previous, instance)
+
+@receiver(post_delete, sender=Transaction)
+def update_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    # When the whole user is being deleted their rollup rows go with them
+    if deleting_user(origin):
+        return
+    rollups.remove_transactions([instance])
+
+@receiver(pre_delete, sender=Category)
+def uncategorise_rollup(sender, instance, origin=None, **kwargs):
+    if deleting_user(origin):
+        return
+    rollups.uncategorise(instance)
@@ -1,3 +1,859 @@
+import gzip
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.models import Sum
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import rollups
+from .authentication import user_cache
+from .blacklist import blacklist_filter
+from .cache import DATA_VERSION_KEY, bump_auth_stamp_on_commit, get_auth_stamp, get_data_version
+from .logins import last_logins
+from .models import Category, Transaction, Budget, MonthlyCategoryTotal
+from .renderers import ORJSONRenderer, msgpack, orjson
+from .search import has_search_index
+from .serializers import BudgetSerializer, CategorySerializer, TransactionSerializer
+from .views import BudgetViewSet, CategoryDetail, CategoryList
+
+# Tests clear the cache, so never point them at a cache shared with running servers
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'finance-tests'},
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FinanceAPITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='alice', password='secret123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.groceries = Category.objects.get(user=self.user, name='Groceries')
+        self.salary = Category.objects.get(user=self.user, name='Salary')
+
+    def create_transactions(self, count, user=None):
+        user = user or self.user
+        categories = [self.groceries, self.salary] if user == self.user else [None]
+        transactions = Transaction.objects.bulk_create([
+            Transaction(
+                user=user,
+                category=categories[i % len(categories)],
+                amount=Decimal('10.00') + i,
+                type='expense' if i % 2 == 0 else 'income',
+                description=f'Transaction {i}',
+                date=date(2025, 1 + i % 12, 1 + i % 28)
+            )
+            for i in range(count)
+        ])
+        rollups.add_transactions(transactions)
+        return transactions
+
+
+class QueryPlanTests(FinanceAPITestCase):
+    """The hot read paths must be served by an index, not a full table scan."""
+
+    TABLE_SCAN = re.compile(r'\bSCAN (finance_transaction|finance_budget|finance_monthlycategorytotal)\b')
+
+    def setUp(self):
+        super().setUp()
+        self.create_transactions(50)
+        Budget.objects.create(
+            user=self.user, category=self.groceries, amount=Decimal('500.00'),
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 31)
+        )
+
+    def assert_index_only(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 400, response.content)
+
+        checked = 0
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT') or not re.search(r'"finance_(transaction|budget|monthlycategorytotal)"', sql):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = '\n'.join(row[-1] for row in cursor.fetchall())
+            self.assertIsNone(self.TABLE_SCAN.search(plan), f'{sql}\n{plan}')
+            checked += 1
+        self.assertGreater(checked, 0, f'No finance queries captured for {url}')
+
+    def test_transaction_list(self):
+        self.assert_index_only('get', '/api/transactions/')
+        self.assert_index_only('get', '/api/transactions/?start_date=2025-01-01&end_date=2025-03-31&type=expense')
+        self.assert_index_only('get', f'/api/transactions/?category={self.groceries.id}')
+        cursor_page = self.client.get('/api/transactions/?pagination=cursor&page_size=5').data
+        self.assert_index_only('get', cursor_page['next'])
+
+    def test_dashboard(self):
+        self.assert_index_only('get', '/api/dashboard/?start_date=2025-01-01&end_date=2025-01-31')
+        self.assert_index_only('get', '/api/dashboard/?start_date=2025-01-05&end_date=2025-01-20')
+
+    def test_monthly_trends(self):
+        self.assert_index_only('get', '/api/transactions/monthly_trends/?start=2025-01-01&end=2025-12-31')
+        self.assert_index_only('get', '/api/transactions/monthly_trends/?start=2025-01-01&end=2025-12-15')
+
+    def test_budget_list_and_summary(self):
+        self.assert_index_only('get', '/api/budgets/')
+        self.assert_index_only('get', '/api/budgets/summary/')
+
+    def test_budget_overlap_check(self):
+        self.assert_index_only('post', '/api/budgets/', {
+            'category': self.groceries.id,
+            'amount': '600.00',
+            'start_date': '2025-01-01',
+            'end_date': '2025-01-31'
+        })
+
+
+class MonthlyRollupTests(FinanceAPITestCase):
+    def snapshot(self):
+        return sorted(
+            (row.user_id, row.category_id or 0, row.month, row.type, row.total, row.count)
+            for row in MonthlyCategoryTotal.objects.filter(count__gt=0)
+        )
+
+    def test_incremental_rollup_matches_rebuild(self):
+        transactions = self.create_transactions(40)
+
+        moved = Transaction.objects.create(
+            user=self.user, category=self.groceries, amount=Decimal('7.25'),
+            type='expense', description='Moved', date=date(2025, 3, 3)
+        )
+        moved.date = date(2025, 4, 30)
+        moved.category = self.salary
+        moved.type = 'income'
+        moved.amount = Decimal('8.00')
+        moved.save()
+
+        response = self.client.patch(
+            f'/api/transactions/{transactions[0].id}/',
+            {'date': '2024-12-31', 'amount': '3.00'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.client.delete(f'/api/transactions/{transactions[2].id}/')
+        self.groceries.delete()
+
+        incremental = self.snapshot()
+        rollups.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+        self.user.delete()
+        self.assertFalse(MonthlyCategoryTotal.objects.exists())
+
+    def test_failed_rollup_update_rolls_back_the_write(self):
+        transaction = self.create_transactions(1)[0]
+        before = self.snapshot()
+        with mock.patch.object(rollups, 'apply_delta', side_effect=DatabaseError('rollup unavailable')):
+            with self.assertRaises(DatabaseError):
+                self.client.post('/api/transactions/', {
+                    'category': self.groceries.id, 'amount': '5.00', 'type': 'expense',
+                    'description': 'Tea', 'date': '2025-02-01'
+                }, format='json')
+            with self.assertRaises(DatabaseError):
+                self.client.patch(f'/api/transactions/{transaction.id}/', {'amount': '99.00'}, format='json')
+            with self.assertRaises(DatabaseError):
+                self.client.delete(f'/api/transactions/{transaction.id}/')
+
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.amount, Decimal('10.00'))
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(self.snapshot(), before)
+
+
+class DashboardCacheTests(FinanceAPITestCase):
+    URL = '/api/dashboard/?start_date=2025-01-01&end_date=2025-12-31'
+
+    def test_repeat_dashboard_costs_no_sql(self):
+        self.create_transactions(20)
+        first = self.client.get(self.URL)
+        with self.assertNumQueries(0):
+            repeat = self.client.get(self.URL)
+        self.assertEqual(repeat.data, first.data)
+
+        version = get_data_version(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(
+                user=self.user, category=self.groceries, amount=Decimal('99.00'),
+                type='expense', description='Late entry', date=date(2025, 6, 1)
+            )
+            # Readers must not see the new version before the row is committed
+            self.assertEqual(get_data_version(self.user.pk), version)
+        response = self.client.get(self.URL)
+        self.assertEqual(Decimal(response.data['total_expenses']), Decimal(first.data['total_expenses']) + Decimal('99.00'))
+
+    def test_user_delete_skips_version_bumps(self):
+        self.create_transactions(30)
+        user_id = self.user.pk
+        version = get_data_version(user_id)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.delete()
+        # Only the auth stamp bump, so other workers stop authenticating the user
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertEqual(get_data_version(user_id), version)
+
+    def test_cascade_bumps_once(self):
+        Budget.objects.bulk_create([
+            Budget(
+                user=self.user, category=self.groceries, amount=Decimal('500.00'),
+                start_date=date(2025, month, 1), end_date=date(2025, month, 28)
+            )
+            for month in range(1, 13)
+        ])
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.groceries.delete()
+        self.assertEqual(len(callbacks), 1)
+
+
+class StatementImportTests(FinanceAPITestCase):
+    STATEMENT = (
+        'Date,Description,Amount,Category\n'
+        '2025-01-03,Corner shop,-12.50,Groceries\n'
+        '2025-01-04,Payroll,"1,500.00",Salary\n'
+        '2025-01-05,Bookshop,-20,Books\n'
+        '2025-01-03,Corner shop,-12.50,Groceries\n'
+        '2025-01-06,Broken,NaN,\n'
+        '2025-01-06,Broken,-Infinity,\n'
+        '2025-01-06,Broken,123456789012,\n'
+        '2025-01-06,Broken,1e999999999,\n'
+        '06/01/2025,Broken,-1.00,\n'
+    )
+
+    def upload(self, content):
+        if isinstance(content, str):
+            content = content.encode()
+        return self.client.post('/api/transactions/import/', {
+            'file': SimpleUploadedFile('statement.csv', content, content_type='text/csv')
+        }, format='multipart')
+
+    def test_import_reports_bad_rows(self):
+        response = self.upload(self.STATEMENT)
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data['rows'], 9)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(response.data['duplicates'], 1)
+        self.assertEqual(response.data['categories_created'], 1)
+        self.assertEqual([error['line'] for error in response.data['errors']], [6, 7, 8, 9, 10])
+        self.assertIn('at most 99999999.99', response.data['errors'][2]['error'])
+
+        books = Category.objects.get(user=self.user, name='Books')
+        self.assertEqual(Transaction.objects.get(user=self.user, category=books).amount, Decimal('20.00'))
+        self.assertEqual(
+            MonthlyCategoryTotal.objects.filter(user=self.user).aggregate(total=Sum('total'))['total'],
+            Decimal('1532.50')
+        )
+
+        # Importing the same statement again only finds duplicates
+        response = self.upload(self.STATEMENT)
+        self.assertEqual((response.data['created'], response.data['duplicates']), (0, 4))
+
+    def test_unreadable_line_keeps_and_reports_earlier_chunks(self):
+        dashboard = '/api/dashboard/?start_date=2025-01-01&end_date=2025-01-31'
+        self.assertEqual(self.client.get(dashboard).data['total_expenses'], '0.00')
+
+        statement = (
+            b'date,description,amount\n'
+            + b''.join(b'2025-01-%02d,Purchase %d,-1.00\n' % (1 + i % 28, i) for i in range(1500))
+            + b'2025-01-30,Caf\xff,-5.00\n2025-01-31,After,-5.00\n'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload(statement)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], 1500)
+        self.assertEqual(response.data['stopped_after_line'], 1501)
+        self.assertIn("can't decode byte 0xff", response.data['error'])
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1500)
+        # The committed chunks invalidated the cached dashboard
+        self.assertEqual(self.client.get(dashboard).data['total_expenses'], '1500.00')
+
+    def test_command_and_missing_columns(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as statement:
+            statement.write(self.STATEMENT)
+        self.addCleanup(os.remove, statement.name)
+        output = StringIO()
+        call_command('import_transactions', 'alice', statement.name, chunk_size=2, stdout=output)
+        self.assertIn('Imported 3 of 9 rows', output.getvalue())
+        self.assertIn('Line 8: amount must be at most 99999999.99', output.getvalue())
+
+        response = self.upload('date,amount\n2025-01-01,5\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('description', response.data['error'])
+
+
+class TransactionQueryBudgetTests(FinanceAPITestCase):
+    """List and detail cost the same number of queries however many rows a user has."""
+
+    def assert_budget(self, rows):
+        transactions = self.create_transactions(rows)
+
+        with self.assertNumQueries(2):  # COUNT(*) + page with category joined
+            response = self.client.get('/api/transactions/')
+        self.assertEqual(response.data['count'], rows)
+        self.assertEqual(len(response.data['results']), min(rows, 10))
+
+        with self.assertNumQueries(1):  # page only
+            response = self.client.get('/api/transactions/?pagination=cursor&page_size=100')
+        self.assertEqual(len(response.data['results']), min(rows, 100))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(response.data['next'] or '/api/transactions/?pagination=cursor')
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/transactions/{transactions[-1].id}/')
+        self.assertEqual(response.data['category_name'], transactions[-1].category.name)
+
+    def test_10_rows(self):
+        self.assert_budget(10)
+
+    def test_100_rows(self):
+        self.assert_budget(100)
+
+    def test_1000_rows(self):
+        self.assert_budget(1000)
+
+    def test_empty_list(self):
+        with self.assertNumQueries(1):  # Django's paginator skips the page fetch when COUNT(*) is 0
+            response = self.client.get('/api/transactions/')
+        self.assertEqual(response.data['message'], 'No transactions found.')
+
+
+class CursorPaginationTests(FinanceAPITestCase):
+    def test_same_date_rows_are_paged_by_seek(self):
+        self.create_transactions(3)
+        same_day = Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user, category=self.groceries, amount=Decimal('1.00'), type='expense',
+                description=f'Same day {i}', date=date(2025, 6, 15)
+            )
+            for i in range(20)
+        ])
+        # Identical timestamps leave only the id to break ties
+        Transaction.objects.filter(pk__in=[t.pk for t in same_day]).update(created_at=timezone.now())
+        expected = list(
+            Transaction.objects.filter(user=self.user).order_by('-date', '-created_at', '-id').values_list('id', flat=True)
+        )
+
+        seen = []
+        url = '/api/transactions/?pagination=cursor&page_size=4'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertNotIn('OFFSET', queries[-1]['sql'])
+            seen += [row['id'] for row in response.data['results']]
+            last_page, url = response.data, response.data['next']
+        self.assertEqual(seen, expected)
+
+        # Walking back from the last page visits every row again, in order
+        seen = [row['id'] for row in last_page['results']]
+        url = last_page['previous']
+        while url:
+            response = self.client.get(url)
+            seen = [row['id'] for row in response.data['results']] + seen
+            url = response.data['previous']
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/transactions/?cursor=cD0yMDI1LTAxLTAx')  # DRF's date-only "p=2025-01-01"
+        self.assertEqual(response.status_code, 404)
+
+
+class TransactionSearchTests(FinanceAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.tea = Transaction.objects.create(
+            user=self.user, category=self.groceries, amount=Decimal('4.50'), type='expense',
+            description='Green tea at Café Nero', date=date(2025, 1, 2)
+        )
+        self.sale = Transaction.objects.create(
+            user=self.user, category=None, amount=Decimal('30.00'), type='expense',
+            description='Shoes, 50% off', date=date(2025, 1, 3)
+        )
+
+    def search(self, query):
+        response = self.client.get('/api/transactions/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.data['results']}
+
+    def require_search_index(self):
+        if not has_search_index(connection.alias):
+            self.skipTest('SQLite FTS5 is not available')
+
+    def test_word_prefix_matching(self):
+        self.require_search_index()
+        self.assertEqual(self.search('gre'), {self.tea.id})
+        self.assertEqual(self.search('nero GREEN'), {self.tea.id})  # every word, any order
+        self.assertEqual(self.search('cafe'), {self.tea.id})  # diacritics folded
+        self.assertEqual(self.search('groc'), {self.tea.id})  # category name
+        self.assertEqual(self.search('tea shoes'), set())
+        self.assertEqual(self.search('ero'), set())  # words match by prefix, not substring
+
+    def test_index_follows_writes(self):
+        self.require_search_index()
+        self.client.patch(f'/api/transactions/{self.tea.id}/', {'description': 'Oolong'}, format='json')
+        self.assertEqual(self.search('oolong'), {self.tea.id})
+        self.assertEqual(self.search('green'), set())
+
+        self.groceries.name = 'Supermarket'
+        self.groceries.save()
+        self.assertEqual(self.search('supermarket'), {self.tea.id})
+        self.assertEqual(self.search('groceries'), set())
+
+        self.groceries.delete()  # SET NULL on the transaction clears its category name
+        self.assertEqual(self.search('supermarket'), set())
+        self.assertEqual(self.search('oolong'), {self.tea.id})
+
+    def test_search_joins_only_the_callers_rows(self):
+        self.require_search_index()
+        other = User.objects.create_user(username='bob', password='secret123')
+        Transaction.objects.create(
+            user=other, amount=Decimal('3.00'), type='expense', description='Green tea', date=date(2025, 1, 2)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.search('green'), {self.tea.id})
+        sql = queries[-1]['sql']
+        self.assertEqual(sql.count('MATCH'), 1)  # rank comes from the join, not a per-row subquery
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = '\n'.join(row[-1] for row in cursor.fetchall())
+        self.assertNotIn('SUBQUERY', plan)
+        self.assertIn('finance_transaction USING INTEGER PRIMARY KEY', plan)
+
+    def test_punctuation_only_query_falls_back_to_icontains(self):
+        self.assertEqual(self.search('%'), {self.sale.id})
+
+
+class CachedJWTAuthenticationTests(FinanceAPITestCase):
+    def setUp(self):
+        super().setUp()
+        user_cache.clear()
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_user_lookup_is_cached(self):
+        with self.assertNumQueries(2):  # auth_user + category list
+            self.client.get('/api/categories/')
+        with self.assertNumQueries(1):  # category list only
+            response = self.client.get('/api/categories/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_deactivation_invalidates_cache(self):
+        self.client.get('/api/categories/')
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get('/api/categories/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_save_in_another_worker_invalidates_cache(self):
+        self.client.get('/api/categories/')
+        # Another process deactivates the user: no local signal, only its stamp bump
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).update(is_active=False)
+            bump_auth_stamp_on_commit(self.user.pk)
+        response = self.client.get('/api/categories/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_user_save_bumps_shared_stamp(self):
+        stamp = get_auth_stamp(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('changed123')
+            self.user.save()
+        self.assertNotEqual(get_auth_stamp(self.user.pk), stamp)
+
+
+class LoginTests(FinanceAPITestCase):
+    def test_login_reuses_user_and_defers_last_login(self):
+        client = APIClient()
+        with self.assertNumQueries(2):  # user lookup + outstanding refresh token
+            response = client.post(
+                '/api/auth/login/', {'username': 'alice', 'password': 'secret123'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['username'], 'alice')
+        self.assertIn('access', response.data)
+
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+        self.assertEqual(last_logins.flush(), 1)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    def test_invalid_credentials(self):
+        response = APIClient().post(
+            '/api/auth/login/', {'username': 'alice', 'password': 'wrong'}, format='json'
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(last_logins.flush(), 0)
+
+
+class TokenBlacklistTests(FinanceAPITestCase):
+    def setUp(self):
+        super().setUp()
+        blacklist_filter.reset()
+        self.refresh = RefreshToken.for_user(self.user)
+
+    def test_refresh_skips_blacklist_query_on_filter_miss(self):
+        blacklist_filter.might_contain('warm-up')  # builds the filter
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().post('/api/auth/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 0)
+
+    def test_logout_revokes_refresh(self):
+        blacklist_filter.might_contain('warm-up')
+        self.client.post('/api/auth/logout/', {'refresh_token': str(self.refresh)}, format='json')
+        response = APIClient().post('/api/auth/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 401)
+        response = APIClient().post('/api/auth/validate-token/', {'token': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(TOKEN_BLACKLIST_SYNC_SECONDS=0)
+    def test_sync_skips_expired_rows(self):
+        expired = RefreshToken.for_user(self.user)
+        OutstandingToken.objects.filter(jti=expired['jti']).update(expires_at=timezone.now() - timedelta(days=1))
+        expired.blacklist()
+
+        blacklist_filter.might_contain('warm-up')  # builds the filter without the expired row
+        self.assertEqual(blacklist_filter.last_id, BlacklistedToken.objects.get().pk)
+        with CaptureQueriesContext(connection) as queries:
+            blacklist_filter.might_contain('warm-up')  # syncs
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(blacklist_filter.bloom.count, 0)
+
+    def test_prune_deletes_only_expired_tokens(self):
+        expired = RefreshToken.for_user(self.user)
+        OutstandingToken.objects.filter(jti=expired['jti']).update(expires_at=timezone.now() - timedelta(days=1))
+        expired.blacklist()
+        call_command('prune_token_blacklist', batch_size=1, stdout=StringIO())
+        self.assertFalse(OutstandingToken.objects.filter(jti=expired['jti']).exists())
+        self.assertFalse(BlacklistedToken.objects.exists())
+        self.assertTrue(OutstandingToken.objects.filter(jti=self.refresh['jti']).exists())
+
+    @override_settings(TOKEN_BLACKLIST_SYNC_SECONDS=0)
+    def test_filter_after_prune(self):
+        expired = RefreshToken.for_user(self.user)
+        OutstandingToken.objects.filter(jti=expired['jti']).update(expires_at=timezone.now() - timedelta(days=1))
+        expired.blacklist()
+        revoked = RefreshToken.for_user(self.user)
+        revoked.blacklist()
+        blacklist_filter.might_contain('warm-up')  # builds the filter
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command('prune_token_blacklist', batch_size=1, stdout=StringIO())
+        # The expired token is fast-deleted: one DELETE for its blacklist row, one for itself
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('DELETE')]), 2)
+        self.assertEqual(BlacklistedToken.objects.get().token.jti, revoked['jti'])
+
+        self.assertTrue(blacklist_filter.might_contain(revoked['jti']))
+        response = APIClient().post('/api/auth/refresh/', {'refresh': str(revoked)}, format='json')
+        self.assertEqual(response.status_code, 401)
+        response = APIClient().post('/api/auth/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+
+class ConditionalGetTests(FinanceAPITestCase):
+    def set_data_version(self, seconds):
+        cache.set(DATA_VERSION_KEY.format(user_id=self.user.pk), int(seconds * 1_000_000_000), None)
+
+    def test_unchanged_refetch_is_not_modified(self):
+        self.set_data_version(time.time() - 5)
+        response = self.client.get('/api/categories/')
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get('/api/dashboard/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_same_second_write_is_not_modified_since(self):
+        second = int(time.time())
+        with mock.patch('finance.conditional.time.time', return_value=second + 0.5):
+            self.set_data_version(second + 0.2)
+            response = self.client.get('/api/dashboard/')
+            # Another write may still land in this second, so there is no Last-Modified yet
+            self.assertFalse(response.has_header('Last-Modified'))
+            self.set_data_version(second + 0.4)
+            response = self.client.get('/api/dashboard/', HTTP_IF_MODIFIED_SINCE=http_date(second))
+            self.assertEqual(response.status_code, 200)
+
+        with mock.patch('finance.conditional.time.time', return_value=second + 1.5):
+            last_modified = self.client.get('/api/dashboard/')['Last-Modified']
+            self.assertEqual(last_modified, http_date(second + 1))
+            response = self.client.get('/api/dashboard/', HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, 304)
+            self.set_data_version(second + 1.7)
+            response = self.client.get('/api/dashboard/', HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, 200)
+
+    def test_budget_write_changes_etag(self):
+        etag = self.client.get('/api/budgets/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Budget.objects.create(
+                user=self.user, category=self.groceries, amount=Decimal('500.00'),
+                start_date=date(2025, 1, 1), end_date=date(2025, 1, 31)
+            )
+        response = self.client.get('/api/budgets/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_replica_reads_are_not_cached_or_validated(self):
+        with mock.patch('finance.conditional.reading_from_replica', return_value=True), \
+                mock.patch('finance.views.reading_from_replica', return_value=True):
+            response = self.client.get('/api/dashboard/')
+            self.assertFalse(response.has_header('ETag'))
+            self.assertFalse(response.has_header('Last-Modified'))
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get('/api/dashboard/')
+            self.assertTrue(queries)  # the replica's result was not cached
+
+    def test_bulk_budget_setup_changes_etag(self):
+        etag = self.client.get('/api/budgets/')['ETag']
+        call_command('setup_budgets', 'alice', month='2025-01', stdout=StringIO())
+        response = self.client.get('/api/budgets/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class RendererTests(FinanceAPITestCase):
+    @skipUnless(orjson, 'orjson is not installed')
+    def test_orjson_matches_drf_json(self):
+        data = {
+            'amount': Decimal('12.50'),
+            'when': timezone.now(),
+            'day': date(2025, 1, 31),
+            'by_category': {None: 1.5, 'Groceries': 2},
+            'text': 'café',
+            'separators': ['a\u2028b', '\u2029'],
+            'big': 2 ** 70,
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    @skipUnless(orjson, 'orjson is not installed')
+    def test_orjson_float_exponents_differ_from_drf_json(self):
+        # Documented difference: same value, different spelling of the exponent
+        self.assertEqual(ORJSONRenderer().render([1e16, 1e-7]), b'[1e16,1e-7]')
+        self.assertEqual(JSONRenderer().render([1e16, 1e-7]), b'[1e+16,1e-07]')
+
+    @skipUnless(msgpack, 'msgpack is not installed')
+    def test_msgpack_round_trip(self):
+        self.create_transactions(3)
+        response = self.client.get('/api/transactions/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content)['count'], 3)
+
+        body = msgpack.packb({'amount': '5.00', 'type': 'expense', 'description': 'Tea', 'date': '2025-02-01'})
+        response = self.client.post('/api/transactions/', body, content_type='application/msgpack')
+        self.assertEqual(response.status_code, 201, response.content)
+
+
+class CompressionTests(FinanceAPITestCase):
+    def test_large_responses_are_gzipped(self):
+        self.create_transactions(100)
+        response = self.client.get('/api/transactions/?page_size=100', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.content))['count'], 100)
+
+        response = self.client.get('/api/transactions/export/?format=csv', HTTP_ACCEPT_ENCODING='gzip;q=1, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)).count(b'\n'), 101)
+
+    @override_settings(STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    def test_html_is_not_compressed(self):
+        self.create_transactions(100)
+        # Browsable API and admin pages pair a CSRF token with reflected input (BREACH)
+        response = self.client.get(
+            '/api/transactions/?page_size=100&search=transaction', HTTP_ACCEPT='text/html', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+        self.assertGreater(len(response.content), 1024)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = self.client.get('/admin/login/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.get('/api/budgets/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_gzipped_request_body(self):
+        body = gzip.compress(json.dumps([
+            {'amount': '5.00', 'type': 'expense', 'description': 'Tea', 'date': '2025-02-01'}
+        ] * 3).encode())
+        response = self.client.post(
+            '/api/transactions/bulk/', body, content_type='application/json', HTTP_CONTENT_ENCODING='gzip'
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 3)
+
+        response = self.client.post(
+            '/api/transactions/bulk/', b'not gzip', content_type='application/json', HTTP_CONTENT_ENCODING='gzip'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class FastListParityTests(FinanceAPITestCase):
+    """List endpoints must render exactly what the full serializers would."""
+
+    def setUp(self):
+        super().setUp()
+        self.create_transactions(30)
+        Transaction.objects.create(
+            user=self.user, category=None, amount=Decimal('7.10'), type='expense',
+            description='Uncategorised', date=date(2025, 3, 3)
+        )
+        Budget.objects.create(
+            user=self.user, category=self.groceries, amount=Decimal('500.00'),
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 31)
+        )
+
+    def assert_parity(self, url, serializer_class, queryset):
+        results = self.client.get(url).data['results']
+        self.assertTrue(results)
+        expected = serializer_class(queryset[:len(results)], many=True).data
+        self.assertEqual(ORJSONRenderer().render(results), ORJSONRenderer().render(expected))
+        return results
+
+    def test_transactions(self):
+        queryset = Transaction.objects.filter(user=self.user).select_related('category')
+        self.assert_parity('/api/transactions/', TransactionSerializer, queryset.order_by('-date', '-created_at'))
+        results = self.assert_parity(
+            '/api/transactions/?pagination=cursor&page_size=100', TransactionSerializer,
+            queryset.order_by('-date', '-created_at', '-id')
+        )
+        # DRF omits category_name when the category is null
+        self.assertTrue(any('category_name' not in row for row in results))
+
+    def test_budgets(self):
+        queryset = BudgetViewSet().annotate_spending(Budget.objects.filter(user=self.user).select_related('category'))
+        self.assert_parity('/api/budgets/', BudgetSerializer, queryset)
+
+    def test_categories(self):
+        self.assert_parity('/api/categories/', CategorySerializer, Category.objects.filter(user=self.user))
+
+
+class SparseFieldsetTests(FinanceAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.transactions = self.create_transactions(15)
+
+    def test_list_fields_narrow_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/transactions/?fields=id,amount,date')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'amount', 'date'})
+        page_sql = queries[-1]['sql']
+        self.assertNotIn('finance_category', page_sql)
+        self.assertNotIn('description', page_sql)
+
+        response = self.client.get('/api/transactions/?fields=id,category_name&pagination=cursor&page_size=5')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'category_name'})
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_exclude_and_detail(self):
+        Budget.objects.create(
+            user=self.user, category=self.groceries, amount=Decimal('500.00'),
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 31)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/budgets/?exclude=spent_amount,remaining_amount')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data['results'][0]), {
+            'id', 'category', 'category_name', 'amount', 'start_date', 'end_date', 'created_at', 'updated_at'
+        })
+        self.assertNotIn('SUM(', queries[-1]['sql'])  # spending subquery skipped
+
+        transaction = self.transactions[0]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/transactions/{transaction.id}/?exclude=description,created_at,updated_at')
+        self.assertEqual(
+            list(response.data), ['id', 'category', 'category_name', 'amount', 'type', 'date']
+        )
+        self.assertEqual(response.data['category_name'], transaction.category.name)
+        self.assertNotIn('description', queries[-1]['sql'])
+
+    def test_generic_category_views(self):
+        # CategoryList/CategoryDetail don't use ValuesListMixin and must not narrow querysets
+        request = APIRequestFactory().get('/', {'fields': 'id'})
+        force_authenticate(request, self.user)
+        self.assertEqual(CategoryList.as_view()(request).status_code, 200)
+        self.assertEqual(CategoryDetail.as_view()(request, pk=self.groceries.pk).data, {'id': self.groceries.pk})
+
+    def test_unknown_field(self):
+        response = self.client.get('/api/categories/?fields=id,colour')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('colour', str(response.data))
+
+
+class PerformanceMiddlewareTests(FinanceAPITestCase):
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get('/api/categories/')
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="1 queries"', timing)
+        for metric in ('view;dur=', 'render;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+
+    @override_settings(SLOW_REQUEST_MS=0, SLOW_REQUEST_TOP_SQL=1)
+    def test_slow_request_log(self):
+        with self.assertLogs('finance.performance', 'WARNING') as logs:
+            self.client.get('/api/transactions/')
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['path'], '/api/transactions/')
+        self.assertEqual(entry['queries'], 1)
+        self.assertEqual(len(entry['slowest_sql']), 1)
+        self.assertIn('finance_transaction', entry['slowest_sql'][0]['sql'])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class LoadToolingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_seed_load_and_bench(self):
+        call_command('seed_load', users=2, transactions_per_user=40, years=1, stdout=StringIO())
+        user = User.objects.get(username='load-user-0')
+        self.assertEqual(Transaction.objects.filter(user=user).count(), 40)
+        self.assertTrue(Budget.objects.filter(user=user).exists())
+        self.assertEqual(
+            MonthlyCategoryTotal.objects.filter(user=user).aggregate(total=Sum('total'))['total'],
+            Transaction.objects.filter(user=user).aggregate(total=Sum('amount'))['total']
+        )
 
-# Create your tests here.
+        output = StringIO()
+        call_command(
+            'bench', only='transactions.list,transactions.create,budgets.summary',
+            iterations=2, warmup=0, stdout=output, stderr=StringIO()
+        )
+        report = json.loads(output.getvalue())
+        self.assertEqual(set(report['endpoints']), {'transactions.list', 'transactions.create', 'budgets.summary'})
+        self.assertEqual(report['endpoints']['transactions.create']['status'], [201])
+        # Benchmarked writes are rolled back
+        self.assertEqual(Transaction.objects.filter(user=user).count(), 40)
@@ -1,5 +1,17 @@
+from calendar import monthrange
+from datetime import timedelta
+from functools import lru_cache
+
+from .cache import bump_data_version
+from .models import Category
+
+
+@lru_cache(maxsize=None)
 def get_default_categories():
-    """Return a list of default categories for both income and expenses."""
+    """Return the default categories for both income and expenses.
+
+    Built once per process; treat the result as read-only.
+    """
     income_categories = [
         {'name': 'Salary', 'description': 'Regular employment income', 'type': 'income'},
         {'name': 'Freelance', 'description': 'Income from freelance work', 'type': 'income'},
@@ -24,4 +36,77 @@ def get_default_categories():
         {'name': 'Other Expenses', 'description': 'Miscellaneous expenses', 'type': 'expense'},
     ]
 
-    return income_categories + expense_categories 
\ No newline at end of file
+    return tuple(income_categories + expense_categories)
+
+
+def create_default_categories(user, skip_names=(), categories=None):
+    """Create the default categories ``user`` does not have yet with one INSERT.
+
+    ``skip_names`` holds the names the caller already knows exist. Returns the
+    number of categories created.
+    """
+    if categories is None:
+        categories = get_default_categories()
+    missing = [
+        Category(user=user, **category_data)
+        for category_data in categories
+        if category_data['name'] not in skip_names
+    ]
+    if missing:
+        Category.objects.bulk_create(missing)
+        # bulk_create skips model signals, so invalidate cached views here
+        bump_data_version(user.pk)
+    return len(missing)
+
+GRANULARITIES = ('day', 'week', 'month', 'year')
+
+
+def add_months(value, months):
+    """Shift a date by a number of months, clamping the day to the target month."""
+    month_index = value.year * 12 + value.month - 1 + months
+    year, month = divmod(month_index, 12)
+    month += 1
+    return value.replace(year=year, month=month, day=min(value.day, monthrange(year, month)[1]))
+
+
+def truncate_date(value, granularity):
+    """Return the first day of the period containing ``value``."""
+    if granularity == 'day':
+        return value
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    if granularity == 'month':
+        return value.replace(day=1)
+    if granularity == 'year':
+        return value.replace(month=1, day=1)
+    raise ValueError(f'Unsupported granularity: {granularity}')
+
+
+def next_period(value, granularity):
+    """Return the first day of the period following the one starting at ``value``."""
+    if granularity == 'day':
+        return value + timedelta(days=1)
+    if granularity == 'week':
+        return value + timedelta(weeks=1)
+    if granularity == 'month':
+        return add_months(value, 1)
+    if granularity == 'year':
+        return value.replace(year=value.year + 1)
+    raise ValueError(f'Unsupported granularity: {granularity}')
+
+
+def iter_periods(start_date, end_date, granularity):
+    """Yield the start date of every period overlapping ``start_date..end_date``."""
+    current = truncate_date(start_date, granularity)
+    while current <= end_date:
+        yield current
+        current = next_period(current, granularity)
+
+
+def format_period(value, granularity):
+    """Human readable label for a period starting at ``value``."""
+    if granularity == 'month':
+        return value.strftime('%b %Y')
+    if granularity == 'year':
+        return value.strftime('%Y')
+    return value.isoformat()
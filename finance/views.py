@@ -1,28 +1,75 @@
+from decimal import Decimal
+import codecs
+import csv
+import json
+from itertools import chain, islice
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from .models import Category
 from .serializers import CategorySerializer
-from django.db.models import Sum, F, Q
+from django.db.models import (
+    Sum, F, Q, OuterRef, Subquery, Value, DecimalField, ExpressionWrapper
+)
+from django.db.models.functions import Coalesce, TruncDay, TruncWeek, TruncMonth, TruncYear
+from django.utils.dateparse import parse_date
 from django.utils import timezone
 from rest_framework import viewsets, status, views
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from django_filters import rest_framework as filters
 from .models import Transaction, Budget
 from .serializers import (
     TransactionSerializer, BudgetSerializer,
-    DashboardSerializer, UserSerializer
+    DashboardSerializer, UserSerializer, SPARSE_FIELD_METHODS,
+    requested_fields, values_representation
 )
 from rest_framework_simplejwt.views import TokenObtainPairView
-from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
-from .utils import get_default_categories
-from rest_framework_simplejwt.tokens import RefreshToken
+from .renderers import CSVRenderer, NDJSONRenderer
+from .cache import bump_data_version, dashboard_cache_key, get_cached_dashboard, set_cached_dashboard
+from . import rollups
+from .search import search_transactions
+from .pagination import TransactionCursorPagination
+from .importers import StatementError, import_transactions
+from .logins import last_logins
+from .blacklist import FilteredRefreshToken
+from .conditional import ConditionalGetMixin
+from .routers import reading_from_replica
+from .rollups import covers_whole_months, monthly_totals
+from .utils import (
+    get_default_categories, create_default_categories, GRANULARITIES, add_months,
+    iter_periods, format_period
+)
 from rest_framework.views import APIView
 
 # Create your views here.
 
+DEFAULT_TREND_MONTHS = 6
+MAX_TREND_MONTHS = 120
+MAX_TREND_PERIODS = 1000
+
+EXPORT_COLUMNS = ('id', 'date', 'type', 'amount', 'category', 'category_name', 'description', 'created_at')
+EXPORT_FIELDS = ('id', 'date', 'type', 'amount', 'category_id', 'category__name', 'description', 'created_at')
+
+TREND_TRUNCATORS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'year': TruncYear,
+}
+
+class Echo:
+    """File-like object for csv.writer that hands back each row instead of buffering it."""
+
+    def write(self, value):
+        return value
+
 class CategoryList(generics.ListCreateAPIView):
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
@@ -40,49 +87,79 @@ class CategoryDetail(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         return Category.objects.filter(user=self.request.user)
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class ValuesListMixin:
+    """List actions read ``.values()`` rows and serialize them with a precompiled
+    ``ValuesRepresentation`` instead of building model and serializer instances.
+
+    ``?fields=`` / ``?exclude=`` narrow the columns fetched as well as the output:
+    lists select only the requested lookups (joining categories only for
+    ``category_name``) and detail reads load the matching columns with ``only()``.
+    """
+
+    def get_requested_fields(self):
+        if self.request.method not in SPARSE_FIELD_METHODS:
+            return None
+        representation = values_representation(self.get_serializer_class())
+        return requested_fields([name for name, _, _, _ in representation.fields], self.request.query_params)
+
+    def get_values_representation(self):
+        return values_representation(self.get_serializer_class(), self.get_requested_fields())
+
+    def values_queryset(self, queryset, representation):
+        return queryset.values(*representation.lookups)
+
+    def narrow_queryset(self, queryset):
+        """Defer the columns a detail read's ``?fields=`` leaves out."""
+        if self.action != 'retrieve' or self.get_requested_fields() is None:
+            return queryset
+        model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        columns = [queryset.model._meta.pk.name]
+        relations = []
+        for lookup in self.get_values_representation().lookups:
+            root = lookup.split('__')[0]
+            if root in model_fields:  # annotations are computed, not loaded
+                columns.append(lookup)
+                if lookup != root:
+                    relations.append(root)
+        # select_related can't traverse a deferred relation, so join only what is used
+        return queryset.select_related(None).select_related(*relations).only(*columns)
+
+class CategoryViewSet(ValuesListMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Category.objects.filter(user=self.request.user)
+        return self.narrow_queryset(Category.objects.filter(user=self.request.user))
 
     def get_default_categories(self):
         return get_default_categories()
 
     @action(detail=False, methods=['post'])
     def initialize_defaults(self, request):
-        categories_created = 0
-        default_categories = self.get_default_categories()
-
-        for category_data in default_categories:
-            _, created = Category.objects.get_or_create(
-                name=category_data['name'],
-                user=request.user,
-                defaults={
-                    'description': category_data['description'],
-                    'type': category_data['type']
-                }
-            )
-            if created:
-                categories_created += 1
+        existing_names = list(self.get_queryset().values_list('name', flat=True))
+        categories_created = create_default_categories(
+            request.user,
+            skip_names=set(existing_names),
+            categories=self.get_default_categories()
+        )
 
         return Response({
             'message': f'{categories_created} default categories have been created.',
-            'total_categories': Category.objects.filter(user=request.user).count()
+            'total_categories': len(existing_names) + categories_created
         })
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        if not queryset.exists():
+        representation = self.get_values_representation()
+        # Fetch the rows directly; an empty result replaces the separate exists() probe
+        data = representation.to_representation(self.values_queryset(self.get_queryset(), representation))
+        if not data:
             return Response({
                 'results': [],
                 'message': 'No categories found. Would you like to initialize default categories?',
                 'can_initialize_defaults': True
             }, status=status.HTTP_200_OK)
-        serializer = self.get_serializer(queryset, many=True)
         return Response({
-            'results': serializer.data
+            'results': data
         })
 
 class TransactionFilter(filters.FilterSet):
@@ -96,10 +173,7 @@ class TransactionFilter(filters.FilterSet):
     
     def filter_search(self, queryset, name, value):
         if value:
-            return queryset.filter(
-                Q(description__icontains=value) |
-                Q(category__name__icontains=value)
-            )
+            return search_transactions(queryset, value, self.request.user.pk)
         return queryset
 
     class Meta:
@@ -112,91 +186,275 @@ class TransactionFilter(filters.FilterSet):
             'search'
         ]
 
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(ValuesListMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
     filterset_class = TransactionFilter
 
     def get_queryset(self):
-        return Transaction.objects.filter(user=self.request.user)
+        return self.narrow_queryset(Transaction.objects.filter(user=self.request.user).select_related('category'))
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and TransactionCursorPagination.requested(self.request):
+            self._paginator = TransactionCursorPagination()
+        return super().paginator
 
     def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
+        representation = self.get_values_representation()
+        queryset = self.values_queryset(self.filter_queryset(self.get_queryset()), representation)
         page = self.paginate_queryset(queryset)
-        
-        if not queryset.exists():
-            return Response({
-                'results': [],
-                'message': 'No transactions found.'
-            }, status=status.HTTP_200_OK)
-            
+
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            # An empty first page means there is nothing at all; no separate exists() probe
+            if not page and TransactionCursorPagination.cursor_query_param not in request.query_params:
+                return self.empty_response()
+            return self.get_paginated_response(representation.to_representation(page))
+
+        data = representation.to_representation(queryset)
+        if not data:
+            return self.empty_response()
+        return Response(data)
+
+    def values_queryset(self, queryset, representation):
+        lookups = representation.lookups
+        if isinstance(self.paginator, TransactionCursorPagination):
+            # Cursor positions are read from the ordering columns, even when ?fields= omits them
+            lookups += tuple(field.lstrip('-') for field in self.paginator.ordering if field.lstrip('-') not in lookups)
+        return queryset.values(*lookups)
+
+    def empty_response(self):
+        return Response({
+            'results': [],
+            'message': 'No transactions found.'
+        }, status=status.HTTP_200_OK)
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({
+                'error': 'Expected a non-empty JSON array of transactions',
+                'message': 'Invalid bulk payload'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=False, methods=['get'])
-    def monthly_trends(self, request):
-        # Get the last 6 months of data
-        end_date = timezone.now().date()
-        start_date = end_date.replace(day=1)
-        start_date = start_date.replace(month=start_date.month - 5) if start_date.month > 6 else \
-                    start_date.replace(year=start_date.year - 1, month=start_date.month + 7)
+        limit = settings.TRANSACTION_BULK_CREATE_LIMIT
+        if len(items) > limit:
+            return Response({
+                'error': f'At most {limit} transactions can be created per request',
+                'message': 'Invalid bulk payload'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Get all transactions in the date range
-        transactions = self.get_queryset().filter(
-            date__range=[start_date, end_date]
+        # Resolve and ownership-check every referenced category with one query
+        category_ids = set()
+        for item in items:
+            if isinstance(item, dict):
+                try:
+                    category_ids.add(int(item.get('category')))
+                except (TypeError, ValueError):
+                    pass
+        category_map = Category.objects.filter(user=request.user).in_bulk(category_ids)
+
+        context = self.get_serializer_context()
+        context['category_map'] = category_map
+        serializer = self.get_serializer(data=items, many=True, context=context)
+        if not serializer.is_valid():
+            return Response({
+                'errors': serializer.errors,
+                'message': 'No transactions were created.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        with db_transaction.atomic():
+            transactions = Transaction.objects.bulk_create([
+                Transaction(user=request.user, **data)
+                for data in serializer.validated_data
+            ])
+            # bulk_create skips model signals, so keep the rollup and caches in step here
+            rollups.add_transactions(transactions)
+        bump_data_version(request.user.pk)
+
+        return Response(
+            self.get_serializer(transactions, many=True).data,
+            status=status.HTTP_201_CREATED
         )
 
-        # Initialize monthly data
-        monthly_data = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            month_start = current_date.replace(day=1)
-            if current_date.month == 12:
-                month_end = current_date.replace(year=current_date.year + 1, month=1, day=1)
-            else:
-                month_end = current_date.replace(month=current_date.month + 1, day=1)
-            month_end = month_end - timezone.timedelta(days=1)
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = (
+            # created_at is the last column; keep its full ISO 8601 form in both formats
+            row[:-1] + (row[-1].isoformat(),)
+            for row in queryset.values_list(*EXPORT_FIELDS).iterator(
+                chunk_size=settings.TRANSACTION_EXPORT_CHUNK_SIZE
+            )
+        )
 
-            # Get month's transactions
-            month_transactions = transactions.filter(
-                date__range=[month_start, month_end]
+        if request.accepted_renderer.format == 'ndjson':
+            content = (
+                json.dumps(dict(zip(EXPORT_COLUMNS, row)), cls=DjangoJSONEncoder) + '\n'
+                for row in rows
+            )
+            filename = 'transactions.ndjson'
+        else:
+            writer = csv.writer(Echo())
+            content = chain(
+                [writer.writerow(EXPORT_COLUMNS)],
+                (writer.writerow(row) for row in rows)
             )
+            filename = 'transactions.csv'
 
-            # Calculate income and expenses
-            income = month_transactions.filter(type='income').aggregate(
-                total=Sum('amount'))['total'] or 0
-            expenses = month_transactions.filter(type='expense').aggregate(
-                total=Sum('amount'))['total'] or 0
+        response = StreamingHttpResponse(
+            content,
+            content_type=f'{request.accepted_renderer.media_type}; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
-            # Format month name
-            month_name = current_date.strftime('%b %Y')
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_statement(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({
+                'error': 'Upload a CSV file in the "file" field',
+                'message': 'Invalid import request'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-            monthly_data.append({
-                'month': month_name,
+        try:
+            result = import_transactions(request.user, codecs.iterdecode(upload, 'utf-8-sig'))
+        except (StatementError, UnicodeDecodeError, csv.Error) as e:
+            return Response({
+                'error': str(e),
+                'message': 'Invalid import file'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if result.error is not None:
+            # Rows before the unreadable line were imported; report them with the error
+            return Response({
+                'error': result.error,
+                'message': f'Import stopped: the file could not be read after line {result.stopped_after_line}',
+                **result.as_dict()
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result.as_dict(), status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'])
+    def monthly_trends(self, request):
+        try:
+            start_date, end_date, granularity = self.get_trend_range(request.query_params)
+        except ValueError as e:
+            return Response({
+                'error': str(e),
+                'message': 'Invalid trend parameters'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Whole-month ranges can be answered from the monthly rollup table
+        if granularity in ('month', 'year') and covers_whole_months(start_date, end_date):
+            source = monthly_totals(request.user, start_date, end_date)
+            date_field, amount_field = 'month', 'total'
+        else:
+            source = self.get_queryset().filter(date__range=[start_date, end_date])
+            date_field, amount_field = 'date', 'amount'
+
+        # One grouped query: a row per period with conditional income/expense sums
+        totals = source.annotate(
+            period=TREND_TRUNCATORS[granularity](date_field)
+        ).values('period').annotate(
+            income=Sum(amount_field, filter=Q(type='income')),
+            expenses=Sum(amount_field, filter=Q(type='expense'))
+        ).order_by('period')
+        totals_by_period = {row['period']: row for row in totals}
+
+        # Fill empty buckets in Python so the chart always gets a continuous series
+        trend_data = []
+        for period in iter_periods(start_date, end_date, granularity):
+            row = totals_by_period.get(period, {})
+            income = row.get('income') or 0
+            expenses = row.get('expenses') or 0
+            label = format_period(period, granularity)
+
+            item = {
+                'period': period.isoformat(),
+                'label': label,
                 'income': float(income),
                 'expenses': float(expenses),
                 'savings': float(income - expenses)
-            })
+            }
+            if granularity == 'month':
+                item['month'] = label
+            trend_data.append(item)
 
-            # Move to next month
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-            else:
-                current_date = current_date.replace(month=current_date.month + 1)
+        return Response(trend_data)
+
+    def get_trend_range(self, params):
+        """Resolve ``months``/``start``/``end``/``granularity`` into a date range."""
+        granularity = params.get('granularity', 'month')
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+
+        end_date = timezone.now().date()
+        if params.get('end'):
+            end_date = parse_date(params['end'])
+            if end_date is None:
+                raise ValueError('end must be a date in YYYY-MM-DD format')
+
+        if params.get('start'):
+            start_date = parse_date(params['start'])
+            if start_date is None:
+                raise ValueError('start must be a date in YYYY-MM-DD format')
+        else:
+            try:
+                months = int(params.get('months', DEFAULT_TREND_MONTHS))
+            except (TypeError, ValueError):
+                raise ValueError('months must be an integer')
+            if not 1 <= months <= MAX_TREND_MONTHS:
+                raise ValueError(f'months must be between 1 and {MAX_TREND_MONTHS}')
+            start_date = add_months(end_date.replace(day=1), -(months - 1))
+
+        if start_date > end_date:
+            raise ValueError('start must not be after end')
+
+        period_count = len(list(islice(iter_periods(start_date, end_date, granularity), MAX_TREND_PERIODS + 1)))
+        if period_count > MAX_TREND_PERIODS:
+            raise ValueError(f'The requested range spans more than {MAX_TREND_PERIODS} periods')
 
-        return Response(monthly_data)
+        return start_date, end_date, granularity
 
-class BudgetViewSet(viewsets.ModelViewSet):
+class BudgetViewSet(ValuesListMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = BudgetSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Budget.objects.filter(user=self.request.user)
+        queryset = Budget.objects.filter(user=self.request.user)
+        if self.action in ['list', 'retrieve']:
+            queryset = self.annotate_spending(queryset.select_related('category'))
+        return self.narrow_queryset(queryset)
+
+    def annotate_spending(self, queryset):
+        """Annotate spent/remaining amounts with one correlated subquery per budget row."""
+        expenses = Transaction.objects.filter(
+            user=OuterRef('user'),
+            category=OuterRef('category'),
+            type='expense',
+            date__gte=OuterRef('start_date'),
+            date__lte=OuterRef('end_date')
+        ).order_by().values('category').annotate(
+            total=Sum('amount')
+        ).values('total')
+
+        money = DecimalField(max_digits=10, decimal_places=2)
+        return queryset.annotate(
+            spent_amount=Coalesce(Subquery(expenses, output_field=money), Value(Decimal('0')), output_field=money),
+        ).annotate(
+            remaining_amount=ExpressionWrapper(F('amount') - F('spent_amount'), output_field=money)
+        )
+
+    def list(self, request, *args, **kwargs):
+        representation = self.get_values_representation()
+        queryset = self.values_queryset(self.filter_queryset(self.get_queryset()), representation)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(representation.to_representation(page))
+        return Response(representation.to_representation(queryset))
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -227,43 +485,23 @@ class BudgetViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.data)
 
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        if self.action in ['list', 'retrieve']:
-            # Calculate spent and remaining amounts for each budget
-            for budget in self.get_queryset():
-                expenses = Transaction.objects.filter(
-                    user=self.request.user,
-                    category=budget.category,
-                    type='expense',
-                    date__range=[budget.start_date, budget.end_date]
-                ).aggregate(total=Sum('amount'))
-                
-                spent = expenses['total'] or 0
-                budget.spent_amount = spent
-                budget.remaining_amount = budget.amount - spent
-        return context
-
     @action(detail=False, methods=['get'])
     def summary(self, request):
         # Get current month's budgets
         today = timezone.now().date()
         start_date = today.replace(day=1)
-        end_date = (start_date.replace(month=start_date.month + 1) - timezone.timedelta(days=1))
-
-        # Get all expense transactions for the current month
-        transactions = Transaction.objects.filter(
-            user=request.user,
-            type='expense',
-            date__range=[start_date, end_date]
-        )
-
-        # Get expenses by category
-        expenses_by_category = transactions.values(
+        end_date = add_months(start_date, 1) - timezone.timedelta(days=1)
+
+        # Get expenses by category for the current month from the monthly rollup
+        expenses_by_category = monthly_totals(
+            request.user, start_date, end_date
+        ).filter(
+            type='expense'
+        ).values(
             'category',
             'category__name'
         ).annotate(
-            total_spent=Sum('amount')
+            total_spent=Sum('total')
         )
 
         # Get existing budgets
@@ -321,7 +559,7 @@ class BudgetViewSet(viewsets.ModelViewSet):
 
         return Response(summary_data)
 
-class DashboardView(views.APIView):
+class DashboardView(ConditionalGetMixin, views.APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -331,34 +569,50 @@ class DashboardView(views.APIView):
             start_date = request.query_params.get('start_date', today.replace(day=1))
             end_date = request.query_params.get('end_date', today)
 
-            # Calculate totals
+            cache_key = dashboard_cache_key(request.user.pk, start_date, end_date)
+            cached_data = get_cached_dashboard(cache_key)
+            if cached_data is not None:
+                return Response(cached_data)
+
             transactions = Transaction.objects.filter(
                 user=request.user,
                 date__range=[start_date, end_date]
             )
-            
-            income = transactions.filter(type='income').aggregate(
-                total=Sum('amount'))['total'] or 0
-            expenses = transactions.filter(type='expense').aggregate(
-                total=Sum('amount'))['total'] or 0
-            
+
+            # Whole-month ranges can be answered from the monthly rollup table
+            range_start, range_end = parse_date(str(start_date)), parse_date(str(end_date))
+            if range_start and range_end and covers_whole_months(range_start, range_end):
+                source = monthly_totals(request.user, range_start, range_end)
+                amount_field = 'total'
+            else:
+                source = transactions
+                amount_field = 'amount'
+
+            # Calculate totals
+            totals = source.aggregate(
+                income=Sum(amount_field, filter=Q(type='income')),
+                expenses=Sum(amount_field, filter=Q(type='expense'))
+            )
+            income = totals['income'] or 0
+            expenses = totals['expenses'] or 0
+
             # Get expenses by category
-            expenses_by_category = transactions.filter(
+            expenses_by_category = source.filter(
                 type='expense'
             ).values(
                 'category__name'
             ).annotate(
-                total=Sum('amount')
-            ).order_by('-total')
+                category_total=Sum(amount_field)
+            ).order_by('-category_total')
 
             # Format expenses by category
             expenses_dict = {
-                item['category__name']: float(item['total'])
+                item['category__name']: float(item['category_total'])
                 for item in expenses_by_category
             }
 
             # Get recent transactions
-            recent_transactions = transactions.order_by('-date', '-created_at')[:5]
+            recent_transactions = transactions.select_related('category').order_by('-date', '-created_at')[:5]
 
             data = {
                 'total_income': income,
@@ -369,6 +623,9 @@ class DashboardView(views.APIView):
             }
 
             serializer = DashboardSerializer(data)
+            # A lagging replica's totals must not be cached under the current data version
+            if not reading_from_replica():
+                set_cached_dashboard(cache_key, serializer.data)
             return Response(serializer.data)
         except Exception as e:
             return Response({
@@ -404,29 +661,22 @@ class UserView(views.APIView):
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
         try:
-            # First, validate credentials and get tokens
-            response = super().post(request, *args, **kwargs)
-            
-            if response.status_code == 200:
-                # Only if authentication was successful, add user data
-                User = get_user_model()
-                try:
-                    user = User.objects.get(username=request.data.get('username'))
-                    user_serializer = UserSerializer(user)
-                    response.data['user'] = user_serializer.data
-                except User.DoesNotExist:
-                    response.data['user'] = None
-                    
-            return response
-            
-        except Exception as e:
-            # Return the original error response
+            serializer.is_valid(raise_exception=True)
+        except Exception:
             return Response(
                 {"detail": "Invalid credentials"},
                 status=401
             )
 
+        # The serializer already loaded the user while authenticating; reuse it
+        user = serializer.user
+        last_logins.record(user)
+        data = dict(serializer.validated_data)
+        data['user'] = UserSerializer(user).data
+        return Response(data, status=status.HTTP_200_OK)
+
 class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -437,7 +687,7 @@ class LogoutView(APIView):
             
             if refresh_token:
                 # Blacklist the refresh token
-                token = RefreshToken(refresh_token)
+                token = FilteredRefreshToken(refresh_token)
                 token.blacklist()
             
             return Response({
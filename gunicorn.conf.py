@@ -8,6 +8,10 @@ bind = f'0.0.0.0:{port}'
 # Number of worker processes
 workers = multiprocessing.cpu_count() * 2 + 1
 
+# Workers must share cached dashboards and data versions; default to a cache
+# directory inside this checkout rather than per-process memory
+os.environ.setdefault('CACHE_LOCATION', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+
 # Worker class
 worker_class = 'gthread'
 